@@ -1,10 +1,228 @@
+import asyncio
+import logging
 import socket
+import threading
+import time
 import sys
 import os
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from kvlog import setup_logging
+from wire import recv_msg, pack_msg, read_msg, unpack_values, RECV_BUF_SIZE
+
+log = logging.getLogger("kv.client")
+
+
+def _check_key(key):
+    """
+    Reject keys the space-separated commands cannot carry.
+    "DELETE a b" would silently delete key "a".
+    
+    Raises:
+        ValueError: If the key is empty or contains whitespace
+    """
+    if not key or any(c.isspace() for c in key):
+        raise ValueError(f"Invalid key {key!r}: keys must be non-empty and contain no whitespace")
+
+
+def _check_item(key, value):
+    """
+    Reject keys and values the line-based wire framing cannot carry.
+    
+    PUT puts the replica list on the line after the value and MPUT sends one
+    pair per line, so a newline in a value would be silently split off, and
+    an empty value would make the node read the replica line as the value.
+    
+    Raises:
+        ValueError: If the key is invalid (see _check_key), or the value is
+            empty or contains a newline
+    """
+    _check_key(key)
+    if not value or '\n' in value or '\r' in value:
+        raise ValueError(f"Invalid value for key {key!r}: values must be non-empty and contain no newlines")
+
+
+class _NodeCache:
+    """
+    LRU cache of key -> nodes info with a TTL, shared by Client and AsyncClient.
+    """
+    
+    def __init__(self, max_entries, ttl):
+        """
+        Args:
+            max_entries (int): Max keys kept in the cache
+            ttl (float): Seconds a cached lookup stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (nodes_info, expiry)
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """
+        Look up a key.
+        
+        Args:
+            key (str): The key
+        
+        Returns:
+            dict: Cached nodes info, or None on miss/expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[1]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def put(self, key, nodes_info):
+        """
+        Insert a lookup, evicting the least recently used entry.
+        
+        Args:
+            key (str): The key
+            nodes_info (dict): {"primary": ..., "replicas": [...]}
+        """
+        with self._lock:
+            self._entries[key] = (nodes_info, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key):
+        """
+        Drop a cached lookup, e.g. after a node it points at stopped responding.
+        
+        Args:
+            key (str): The key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def _parse_nodes_response(response):
+    """
+    Parse a GET_NODES_FOR_KEY reply.
+    
+    Args:
+        response (str): PRIMARY/REPLICA lines from the coordinator
+    
+    Returns:
+        dict: {"primary": "host:port", "replicas": ["host:port", ...]} or None
+    """
+    result = {"primary": None, "replicas": []}
+    for line in response.split('\n'):
+        parts = line.split()
+        if len(parts) >= 2:
+            if parts[0] == "PRIMARY":
+                result["primary"] = parts[1]
+            elif parts[0] == "REPLICA":
+                result["replicas"].append(parts[1])
+    return result if result["primary"] else None
+
+
+class _PipelinedConn:
+    """
+    One connection carrying up to `window` requests in flight.
+    
+    Servers answer the commands on a connection strictly in order, so replies
+    are matched to requests first-in first-out; a reader thread resolves the
+    oldest pending future as each reply arrives. A request whose caller gave
+    up waiting keeps its place in the queue, so its late reply is consumed
+    by its own future and never handed to a later request.
+    """
+    
+    def __init__(self, sock, window):
+        """
+        Args:
+            sock: Connected blocking socket
+            window (int): Max requests in flight
+        """
+        self.sock = sock
+        self.closed = False
+        self._pending = deque()  # Futures awaiting a reply, oldest first
+        self._send_lock = threading.Lock()
+        self._window = threading.BoundedSemaphore(window)
+        self._buf = bytearray(RECV_BUF_SIZE)  # Reused for every reply
+        threading.Thread(target=self._read_loop, daemon=True).start()
+    
+    def submit(self, payload, timeout=None):
+        """
+        Send one command without waiting for earlier replies.
+        
+        Args:
+            payload (bytes): Command body
+            timeout (float): Seconds to wait for a free slot in the window
+                (None waits forever)
+        
+        Returns:
+            Future: Resolves to the reply body (bytes)
+        
+        Raises:
+            ConnectionError: If the connection is closed
+            TimeoutError: If the window stays full for timeout seconds
+            ValueError: If the payload exceeds the frame size limit
+        """
+        # Frame first: a rejected payload must not leave a reply slot queued
+        frame = pack_msg(payload)
+        if not self._window.acquire(timeout=timeout):
+            raise TimeoutError(f"{len(self._pending)} requests still awaiting a reply")
+        future = Future()
+        with self._send_lock:
+            if self.closed:
+                self._window.release()
+                raise ConnectionError("Connection closed")
+            self._pending.append(future)
+            try:
+                self.sock.sendall(frame)
+            except OSError as e:
+                self._fail(e)
+                raise ConnectionError(str(e)) from e
+        return future
+    
+    def _read_loop(self):
+        """Resolve pending futures with replies until the connection fails."""
+        try:
+            while True:
+                response = bytes(recv_msg(self.sock, self._buf))
+                future = self._pending.popleft()
+                self._window.release()
+                future.set_result(response)
+        except Exception as e:
+            with self._send_lock:
+                self._fail(e)
+    
+    def _fail(self, exc):
+        """
+        Close the connection and fail every pending request.
+        Caller must hold self._send_lock.
+        
+        Args:
+            exc (Exception): Cause reported to waiters
+        """
+        if not self.closed:
+            self.closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)  # Wakes the reader thread
+            except OSError:
+                pass
+            self.sock.close()
+        while self._pending:
+            self._window.release()
+            self._pending.popleft().set_exception(ConnectionError(f"Connection lost: {exc}"))
+    
+    def close(self):
+        """Close the connection, failing any requests still in flight."""
+        with self._send_lock:
+            self._fail(ConnectionError("Connection closed by client"))
+
 
 class Client:
     """
@@ -14,18 +232,175 @@ class Client:
     1. Connect to coordinator and ask which nodes store a key
     2. Connect directly to the primary node for PUT/GET/DELETE
     3. Coordinator returns: primary node + 2 replicas
+    
+    Each coordinator/node gets one long-lived pipelined connection: requests
+    from any number of threads (and the per-node batches of multi_get and
+    multi_put) are sent back-to-back, up to pipeline_window in flight, instead
+    of one round-trip at a time.
+    Coordinator lookups are cached per key (LRU with a TTL), so hot keys
+    skip the coordinator round-trip entirely.
     """
     
-    def __init__(self, coordinator_host='127.0.0.1', coordinator_port=5000):
+    def __init__(self, coordinator_host='127.0.0.1', coordinator_port=5000, pipeline_window=32,
+                 cache_size=4096, cache_ttl=30, timeout=5):
         """
         Initialize the client.
         
         Args:
             coordinator_host (str): Coordinator host
             coordinator_port (int): Coordinator port
+            pipeline_window (int): Max requests in flight per connection
+            cache_size (int): Max keys kept in the node lookup cache
+            cache_ttl (float): Seconds a cached node lookup stays valid
+            timeout (float): Seconds to wait for a connect or a reply
         """
         self.coordinator_host = coordinator_host
         self.coordinator_port = coordinator_port
+        self.pipeline_window = pipeline_window
+        self.timeout = timeout
+        self._conns = {}  # (host, port) -> _PipelinedConn
+        self._connect_locks = {}  # (host, port) -> Lock held while connecting
+        self._conns_lock = threading.Lock()  # Guards both dicts; never held across a connect
+        
+        self._node_cache = _NodeCache(cache_size, cache_ttl)
+    
+    def _get_conn(self, host, port):
+        """
+        Get the pipelined connection to (host, port), opening one if needed.
+        
+        Args:
+            host (str): Destination host
+            port (int): Destination port
+        
+        Returns:
+            tuple: (conn, reused) where reused is True if it was already open
+        """
+        with self._conns_lock:
+            conn = self._conns.get((host, port))
+            if conn is not None and not conn.closed:
+                return conn, True
+            connect_lock = self._connect_locks.setdefault((host, port), threading.Lock())
+        
+        # Connect under a per-destination lock, so a slow node only holds up
+        # the threads that want to talk to it
+        with connect_lock:
+            with self._conns_lock:
+                conn = self._conns.get((host, port))
+            if conn is not None and not conn.closed:
+                return conn, True  # Another thread connected while we waited
+            
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect((host, port))
+            except Exception:
+                sock.close()
+                raise
+            # Replies are awaited with a timeout on each future instead; a socket
+            # timeout would kill the reader thread on an idle connection
+            sock.settimeout(None)
+            
+            conn = _PipelinedConn(sock, self.pipeline_window)
+            with self._conns_lock:
+                self._conns[(host, port)] = conn
+            return conn, False
+    
+    def _submit(self, host, port, command):
+        """
+        Send one command without waiting for the reply.
+        
+        Args:
+            host (str): Destination host
+            port (int): Destination port
+            command (str): Command to send
+        
+        Returns:
+            tuple: (conn, reused, future) for _await_reply
+        """
+        conn, reused = self._get_conn(host, port)
+        return conn, reused, conn.submit(command.encode('utf-8'), self.timeout)
+    
+    def _wait_reply(self, future):
+        """
+        Wait up to self.timeout for a submitted request's reply.
+        
+        A request that times out is abandoned, not torn down: the connection
+        stays open for the other requests sharing it.
+        
+        Args:
+            future (Future): Future returned by _PipelinedConn.submit
+        
+        Returns:
+            bytes: Reply body
+        
+        Raises:
+            TimeoutError: If no reply arrived in time
+        """
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"No reply within {self.timeout}s") from None
+    
+    def _await_reply(self, pending, host, port, command, raw=False):
+        """
+        Wait for the reply to a _submit() call.
+        
+        The connection may have been closed by the server while idle; in that
+        case the command is retried once on a fresh connection, under the same
+        timeout as the first attempt.
+        
+        Args:
+            pending (tuple): Result of _submit
+            host (str): Destination host
+            port (int): Destination port
+            command (str): The command that was sent
+            raw (bool): Return the reply body as bytes instead of decoded text
+        
+        Returns:
+            str: Response (bytes if raw)
+        
+        Raises:
+            TimeoutError: If no reply arrived in time
+        """
+        _, reused, future = pending
+        try:
+            response = self._wait_reply(future)
+        except ConnectionError:
+            if not reused:
+                raise
+            response = self._wait_reply(self._submit(host, port, command)[2])
+        
+        if raw:
+            return response
+        return response.decode('utf-8').strip()
+    
+    def _request(self, host, port, command, raw=False):
+        """
+        Send one command and wait for the reply.
+        
+        Args:
+            host (str): Destination host
+            port (int): Destination port
+            command (str): Command to send
+            raw (bool): Return the reply body as bytes instead of decoded text
+        
+        Returns:
+            str: Response (bytes if raw)
+        """
+        try:
+            pending = self._submit(host, port, command)
+        except ConnectionError:
+            pending = self._submit(host, port, command)  # Raced with a closing connection
+        return self._await_reply(pending, host, port, command, raw)
+    
+    def close(self):
+        """Close all connections."""
+        with self._conns_lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
     
     def _send_to_coordinator(self, command):
         """
@@ -38,22 +413,15 @@ class Client:
             str: Response from coordinator
         """
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self.coordinator_host, self.coordinator_port))
-            
-            sock.sendall(command.encode('utf-8'))
-            response = sock.recv(4096).decode('utf-8').strip()
-            sock.close()
-            
-            return response
+            return self._request(self.coordinator_host, self.coordinator_port, command)
         except Exception as e:
-            print(f"[Client] Error communicating with coordinator: {e}")
+            log.warning("Error communicating with coordinator: %s", e)
             return None
     
     def _get_nodes_for_key(self, key):
         """
-        Query the coordinator for nodes responsible for a key.
+        Find the nodes responsible for a key.
+        Served from the lookup cache when possible, otherwise queries the coordinator.
         
         Args:
             key (str): The key
@@ -61,27 +429,67 @@ class Client:
         Returns:
             dict: {"primary": "host:port", "replicas": ["host:port", ...]} or None on error
         """
+        cached = self._node_cache.get(key)
+        if cached is not None:
+            return cached
+        
         command = f"GET_NODES_FOR_KEY {key}"
         response = self._send_to_coordinator(command)
         
         if not response or response.startswith("ERROR"):
-            print(f"[Client] Coordinator error: {response}")
+            log.warning("Coordinator error: %s", response)
             return None
         
-        lines = response.split('\n')
-        result = {"primary": None, "replicas": []}
+        result = _parse_nodes_response(response)
+        if result is not None:
+            self._node_cache.put(key, result)
+        return result
+    
+    def _get_nodes_for_keys(self, keys):
+        """
+        Find the nodes responsible for many keys.
+        Keys missing from the lookup cache are resolved with a single
+        GET_NODES_FOR_KEYS round-trip to the coordinator.
+        
+        Args:
+            keys (list): The keys
+        
+        Returns:
+            dict: key -> {"primary": ..., "replicas": [...]}, or None on error
+        """
+        result = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            cached = self._node_cache.get(key)
+            if cached is not None:
+                result[key] = cached
+            else:
+                missing.append(key)
+        
+        if not missing:
+            return result
+        
+        response = self._send_to_coordinator(f"GET_NODES_FOR_KEYS {' '.join(missing)}")
+        
+        if not response or response.startswith("ERROR"):
+            log.warning("Coordinator error: %s", response)
+            return None
         
-        for line in lines:
+        # Each line: K key primary [replica ...]
+        for line in response.split('\n'):
             parts = line.split()
-            if len(parts) >= 2:
-                if parts[0] == "PRIMARY":
-                    result["primary"] = parts[1]
-                elif parts[0] == "REPLICA":
-                    result["replicas"].append(parts[1])
+            if len(parts) >= 3 and parts[0] == "K":
+                nodes_info = {"primary": parts[2], "replicas": parts[3:]}
+                result[parts[1]] = nodes_info
+                self._node_cache.put(parts[1], nodes_info)
         
-        return result if result["primary"] else None
+        if any(key not in result for key in missing):
+            log.warning("Coordinator reply is missing keys")
+            return None
+        
+        return result
     
-    def _send_to_node(self, host, port, command):
+    def _send_to_node(self, host, port, command, raw=False):
         """
         Send a command to a node.
         
@@ -89,23 +497,61 @@ class Client:
             host (str): Node host
             port (str): Node port
             command (str): Command to send
+            raw (bool): Return the reply body as bytes instead of decoded text
         
         Returns:
-            str: Response from node
+            str: Response from node (bytes if raw)
         """
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((host, int(port)))
-            
-            sock.sendall(command.encode('utf-8'))
-            response = sock.recv(4096).decode('utf-8').strip()
-            sock.close()
-            
-            return response
-        except Exception as e:
-            print(f"[Client] Error communicating with node {host}:{port}: {e}")
+        return self._send_to_nodes([(host, port, command)], raw)[0]
+    
+    def _send_to_nodes(self, requests, raw=False):
+        """
+        Send commands to nodes back-to-back, then collect the replies.
+        Requests to the same node share its pipelined connection, so the
+        whole batch costs about one round-trip instead of one per command.
+        
+        Args:
+            requests (list): (host, port, command) tuples
+            raw (bool): Return reply bodies as bytes instead of decoded text
+        
+        Returns:
+            list: Responses in request order (None where a request failed)
+        """
+        pending = []
+        for host, port, command in requests:
+            try:
+                pending.append(self._submit(host, int(port), command))
+            except Exception as e:
+                log.warning("Error communicating with node %s:%s: %s", host, port, e)
+                pending.append(None)
+        
+        responses = []
+        for (host, port, command), submitted in zip(requests, pending):
+            if submitted is None:
+                responses.append(None)
+                continue
+            try:
+                responses.append(self._await_reply(submitted, host, int(port), command, raw))
+            except Exception as e:
+                log.warning("Error communicating with node %s:%s: %s", host, port, e)
+                responses.append(None)
+        return responses
+    
+    def _resolve(self, key):
+        """
+        Resolve the nodes holding a key, from the lookup cache when possible.
+        
+        Args:
+            key (str): The key
+        
+        Returns:
+            tuple: (primary, replicas) as "host:port" strings, or None on error
+        """
+        nodes_info = self._get_nodes_for_key(key)
+        if not nodes_info:
+            log.warning("Failed to get nodes for key %s", key)
             return None
+        return nodes_info["primary"], nodes_info["replicas"]
     
     def put(self, key, value):
         """
@@ -117,33 +563,35 @@ class Client:
         
         Returns:
             bool: True if successful, False otherwise
+        
+        Raises:
+            ValueError: If the key or value cannot be sent (see _check_item)
         """
-        # Get nodes from coordinator
-        nodes_info = self._get_nodes_for_key(key)
-        if not nodes_info:
-            print("[Client] Failed to get nodes for key")
+        _check_item(key, value)
+        resolved = self._resolve(key)
+        if resolved is None:
             return False
-        
-        primary = nodes_info["primary"]
-        replicas = nodes_info["replicas"]
+        primary, replicas = resolved
         
         # Send PUT to primary
         host, port = primary.split(':')
         
-        # Include replica nodes in the command so primary can replicate
+        # Include replica nodes (on their own line) so primary can replicate
         replicas_str = ','.join(replicas) if replicas else ""
         if replicas_str:
-            command = f"PUT {key} {value} {replicas_str}"
+            command = f"PUT {key} {value}\n{replicas_str}"
         else:
             command = f"PUT {key} {value}"
         
         response = self._send_to_node(host, port, command)
         
         if response == "OK":
-            print(f"[Client] PUT {key} = {value} [primary: {primary}, replicas: {replicas}]")
+            log.debug("PUT %s = %s [primary: %s, replicas: %s]", key, value, primary, replicas)
             return True
         else:
-            print(f"[Client] PUT failed: {response}")
+            if response is None:
+                self._node_cache.invalidate(key)
+            log.warning("PUT %s failed: %s", key, response)
             return False
     
     def get(self, key):
@@ -155,15 +603,15 @@ class Client:
         
         Returns:
             str: The value, or None if not found
+        
+        Raises:
+            ValueError: If the key cannot be sent (see _check_key)
         """
-        # Get nodes from coordinator
-        nodes_info = self._get_nodes_for_key(key)
-        if not nodes_info:
-            print("[Client] Failed to get nodes for key")
+        _check_key(key)
+        resolved = self._resolve(key)
+        if resolved is None:
             return None
-        
-        primary = nodes_info["primary"]
-        replicas = nodes_info["replicas"]
+        primary, replicas = resolved
         
         # Try primary first
         host, port = primary.split(':')
@@ -172,56 +620,181 @@ class Client:
         
         if response and response.startswith("VALUE"):
             value = response[6:].strip()  # Remove "VALUE " prefix
-            print(f"[Client] GET {key} = {value}")
+            log.debug("GET %s = %s", key, value)
             return value
         
         # If primary fails, try replicas
         if response and response == "NOT_FOUND":
-            print(f"[Client] GET {key}: NOT_FOUND")
+            log.debug("GET %s: NOT_FOUND", key)
             return None
         
-        print(f"[Client] Primary node failed, trying replicas...")
+        # Primary is unreachable or misbehaving: the cached topology may be stale
+        self._node_cache.invalidate(key)
+        log.warning("Primary %s failed for %s, trying replicas...", primary, key)
         for replica in replicas:
             host, port = replica.split(':')
             response = self._send_to_node(host, port, command)
             
             if response and response.startswith("VALUE"):
                 value = response[6:].strip()
-                print(f"[Client] GET {key} = {value} (from replica {replica})")
+                log.debug("GET %s = %s (from replica %s)", key, value, replica)
                 return value
         
-        print(f"[Client] GET {key}: NOT_FOUND (from all replicas)")
+        log.debug("GET %s: NOT_FOUND (from all replicas)", key)
         return None
     
     def delete(self, key):
         """
         Delete a key-value pair from the distributed store.
+        The DELETE goes to the primary and all replicas at once, so a replica
+        can't serve the old value after a failover. If the primary is
+        unreachable the cached lookup is dropped and the delete retried once.
         
         Args:
             key (str): The key
         
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if the primary deleted the key, False otherwise
+        
+        Raises:
+            ValueError: If the key cannot be sent (see _check_key)
         """
-        # Get nodes from coordinator
-        nodes_info = self._get_nodes_for_key(key)
-        if not nodes_info:
-            print("[Client] Failed to get nodes for key")
-            return False
+        _check_key(key)
+        for _ in range(2):
+            resolved = self._resolve(key)
+            if resolved is None:
+                return False
+            primary, replicas = resolved
+            
+            nodes = [primary] + replicas
+            responses = self._send_to_nodes([(*node.split(':'), f"DELETE {key}") for node in nodes])
+            
+            if responses[0] == "OK":
+                failed = [node for node, response in zip(replicas, responses[1:]) if response != "OK"]
+                if failed:
+                    log.warning("DELETE %s not applied on replica(s) %s", key, failed)
+                log.debug("DELETE %s [primary: %s, replicas: %s]", key, primary, replicas)
+                return True
+            
+            if responses[0] is not None:
+                break  # The primary answered; retrying won't change that
+            
+            # Primary unreachable: the cached topology may be stale
+            self._node_cache.invalidate(key)
+        
+        log.warning("DELETE %s failed: %s", key, responses[0])
+        return False
+    
+    def multi_get(self, keys):
+        """
+        Retrieve many values, batching requests per primary node.
+        One coordinator round-trip resolves all keys, then one MGET is sent
+        to each distinct primary.
         
-        primary = nodes_info["primary"]
+        Args:
+            keys (list): The keys
         
-        # Send DELETE to primary
-        host, port = primary.split(':')
-        command = f"DELETE {key}"
-        response = self._send_to_node(host, port, command)
+        Returns:
+            list: Values in the same order as keys (None where not found)
         
-        if response == "OK":
-            print(f"[Client] DELETE {key} [primary: {primary}]")
+        Raises:
+            ValueError: If any key cannot be sent (see _check_key)
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        for key in keys:
+            _check_key(key)
+        
+        nodes_by_key = self._get_nodes_for_keys(keys)
+        if nodes_by_key is None:
+            log.warning("Failed to get nodes for keys")
+            return [None] * len(keys)
+        
+        # Group key positions by primary so each node gets a single request
+        by_primary = {}
+        for i, key in enumerate(keys):
+            by_primary.setdefault(nodes_by_key[key]["primary"], []).append(i)
+        
+        # Send every MGET before waiting on any reply
+        groups = list(by_primary.items())
+        responses = self._send_to_nodes(
+            [(*primary.split(':'), "MGET " + ' '.join(keys[i] for i in positions))
+             for primary, positions in groups],
+            raw=True,
+        )
+        
+        results = [None] * len(keys)
+        for (primary, positions), response in zip(groups, responses):
+            try:
+                values = unpack_values(response) if response else None
+            except ValueError:
+                values = None  # Text error reply
+            
+            if values is None or len(values) != len(positions):
+                # Primary unreachable: fall back to per-key GET, which tries replicas
+                for i in positions:
+                    results[i] = self.get(keys[i])
+                continue
+            
+            for i, value in zip(positions, values):
+                if value is not None:
+                    results[i] = value.decode('utf-8')
+        
+        log.debug("MGET %d keys from %d primary node(s)", len(keys), len(by_primary))
+        return results
+    
+    def multi_put(self, items):
+        """
+        Store many key-value pairs, batching requests per primary node.
+        One coordinator round-trip resolves all keys, then one MPUT is sent
+        per (primary, replicas) group.
+        
+        Args:
+            items (dict or list): Mapping or (key, value) pairs
+        
+        Returns:
+            bool: True if every pair was stored, False otherwise
+        
+        Raises:
+            ValueError: If any key or value cannot be sent (see _check_item)
+        """
+        items = list(items.items()) if isinstance(items, dict) else list(items)
+        if not items:
             return True
-        else:
-            print(f"[Client] DELETE failed: {response}")
+        for key, value in items:
+            _check_item(key, value)
+        
+        nodes_by_key = self._get_nodes_for_keys([key for key, _ in items])
+        if nodes_by_key is None:
+            log.warning("Failed to get nodes for keys")
             return False
+        
+        groups = {}  # (primary, replicas) -> [(key, value), ...]
+        for key, value in items:
+            nodes_info = nodes_by_key[key]
+            group = (nodes_info["primary"], ','.join(sorted(nodes_info["replicas"])))
+            groups.setdefault(group, []).append((key, value))
+        
+        # Send every MPUT before waiting on any reply
+        requests = []
+        for (primary, replicas_str), batch in groups.items():
+            header = f"MPUT {replicas_str}" if replicas_str else "MPUT"
+            command = header + '\n' + '\n'.join(f"{key} {value}" for key, value in batch)
+            requests.append((*primary.split(':'), command))
+        responses = self._send_to_nodes(requests)
+        
+        success = True
+        for ((primary, replicas_str), batch), response in zip(groups.items(), responses):
+            if response != "OK":
+                if response is None:
+                    for key, _ in batch:
+                        self._node_cache.invalidate(key)
+                log.warning("MPUT to %s failed: %s", primary, response)
+                success = False
+        
+        log.debug("MPUT %d keys to %d node group(s)", len(items), len(groups))
+        return success
     
     def interactive_shell(self):
         """Run an interactive shell for the client."""
@@ -252,19 +825,20 @@ class Client:
                     if len(parts) < 3:
                         print("Usage: PUT key value")
                         continue
-                    self.put(parts[1], parts[2])
+                    print("OK" if self.put(parts[1], parts[2]) else "FAILED")
                 
                 elif cmd == "GET":
                     if len(parts) < 2:
                         print("Usage: GET key")
                         continue
-                    self.get(parts[1])
+                    value = self.get(parts[1])
+                    print(value if value is not None else "NOT_FOUND")
                 
                 elif cmd == "DELETE":
                     if len(parts) < 2:
                         print("Usage: DELETE key")
                         continue
-                    self.delete(parts[1])
+                    print("OK" if self.delete(parts[1]) else "FAILED")
                 
                 elif cmd == "LIST_NODES":
                     response = self._send_to_coordinator("LIST_NODES")
@@ -280,6 +854,294 @@ class Client:
                 print(f"Error: {e}")
 
 
+class AsyncClient:
+    """
+    asyncio client for the Distributed Key-Value Store.
+    
+    Mirrors Client, but uses asyncio streams so many operations can be in
+    flight at once. put_quorum() writes to the primary and its replicas
+    concurrently and returns as soon as w of them have acknowledged, instead
+    of waiting for the primary to replicate serially.
+    """
+    
+    def __init__(self, coordinator_host='127.0.0.1', coordinator_port=5000, max_conns_per_host=4,
+                 cache_size=4096, cache_ttl=30, timeout=5):
+        """
+        Initialize the client.
+        
+        Args:
+            coordinator_host (str): Coordinator host
+            coordinator_port (int): Coordinator port
+            max_conns_per_host (int): Idle connections kept per (host, port)
+            cache_size (int): Max keys kept in the node lookup cache
+            cache_ttl (float): Seconds a cached node lookup stays valid
+            timeout (float): Seconds to wait for a connect or a reply
+        """
+        self.coordinator_host = coordinator_host
+        self.coordinator_port = coordinator_port
+        self.max_conns_per_host = max_conns_per_host
+        self.timeout = timeout
+        self._pools = {}  # (host, port) -> list of idle (reader, writer) pairs
+        self._node_cache = _NodeCache(cache_size, cache_ttl)
+        self._background = set()  # Writes still running after a quorum was reached
+    
+    async def _request(self, host, port, command):
+        """
+        Send one command over a pooled stream and wait for the reply.
+        
+        A pooled stream may have been closed by the server while idle; in that
+        case the command is retried once on a fresh connection.
+        
+        Args:
+            host (str): Destination host
+            port (int): Destination port
+            command (str): Command to send
+        
+        Returns:
+            str: Response
+        """
+        pool = self._pools.setdefault((host, port), [])
+        payload = pack_msg(command.encode('utf-8'))
+        while True:
+            reused = bool(pool)
+            if reused:
+                reader, writer = pool.pop()
+            else:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), self.timeout)
+            try:
+                writer.write(payload)
+                await writer.drain()
+                response = await asyncio.wait_for(read_msg(reader), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                # Includes cancellation: the reply may still be in flight, so
+                # the stream can't be handed to another request
+                writer.close()
+                raise
+            
+            if len(pool) < self.max_conns_per_host:
+                pool.append((reader, writer))
+            else:
+                writer.close()
+            return response.decode('utf-8').strip()
+    
+    async def _send(self, host, port, command):
+        """
+        Send a command, logging and swallowing errors.
+        
+        Args:
+            host (str): Destination host
+            port (str): Destination port
+            command (str): Command to send
+        
+        Returns:
+            str: Response, or None on error
+        """
+        try:
+            return await self._request(host, int(port), command)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Error communicating with %s:%s: %s", host, port, e)
+            return None
+    
+    async def close(self):
+        """Close all pooled connections and wait for background writes."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        for pool in self._pools.values():
+            for _, writer in pool:
+                writer.close()
+        self._pools.clear()
+    
+    async def _get_nodes_for_key(self, key):
+        """
+        Find the nodes responsible for a key.
+        Served from the lookup cache when possible, otherwise queries the coordinator.
+        
+        Args:
+            key (str): The key
+        
+        Returns:
+            dict: {"primary": "host:port", "replicas": ["host:port", ...]} or None on error
+        """
+        cached = self._node_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._send(self.coordinator_host, self.coordinator_port,
+                                    f"GET_NODES_FOR_KEY {key}")
+        if not response or response.startswith("ERROR"):
+            log.warning("Coordinator error: %s", response)
+            return None
+        
+        result = _parse_nodes_response(response)
+        if result is not None:
+            self._node_cache.put(key, result)
+        return result
+    
+    async def put(self, key, value):
+        """
+        Store a key-value pair; the primary replicates it, as with Client.put.
+        
+        Args:
+            key (str): The key
+            value (str): The value
+        
+        Returns:
+            bool: True if successful, False otherwise
+        
+        Raises:
+            ValueError: If the key or value cannot be sent (see _check_item)
+        """
+        _check_item(key, value)
+        nodes_info = await self._get_nodes_for_key(key)
+        if not nodes_info:
+            log.warning("Failed to get nodes for key %s", key)
+            return False
+        
+        host, port = nodes_info["primary"].split(':')
+        command = f"PUT {key} {value}"
+        if nodes_info["replicas"]:
+            command += '\n' + ','.join(nodes_info["replicas"])
+        
+        response = await self._send(host, port, command)
+        if response == "OK":
+            return True
+        if response is None:
+            self._node_cache.invalidate(key)
+        log.warning("PUT %s failed: %s", key, response)
+        return False
+    
+    async def put_quorum(self, key, value, w=2):
+        """
+        Write a key-value pair to the primary and all replicas in parallel.
+        
+        Each node is sent PUT_NO_REPLICATE, so none of them replicates again.
+        Returns once w nodes have acknowledged; writes to slower nodes keep
+        running in the background.
+        
+        Args:
+            key (str): The key
+            value (str): The value
+            w (int): Acknowledgements required (capped at the replica set size)
+        
+        Returns:
+            bool: True if at least w nodes stored the value, False otherwise
+        
+        Raises:
+            ValueError: If the key or value cannot be sent (see _check_item)
+        """
+        _check_item(key, value)
+        nodes_info = await self._get_nodes_for_key(key)
+        if not nodes_info:
+            log.warning("Failed to get nodes for key %s", key)
+            return False
+        
+        targets = [nodes_info["primary"]] + nodes_info["replicas"]
+        w = min(w, len(targets))
+        command = f"PUT_NO_REPLICATE {key} {value}"
+        pending = {
+            asyncio.ensure_future(self._send(*target.split(':'), command))
+            for target in targets
+        }
+        
+        acks = 0
+        while pending and acks < w:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            acks += sum(1 for task in done if task.result() == "OK")
+        
+        for task in pending:
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        
+        if acks >= w:
+            log.debug("PUT %s = %s [%d/%d acks]", key, value, acks, len(targets))
+            return True
+        
+        self._node_cache.invalidate(key)
+        log.warning("PUT %s failed: %d/%d acks", key, acks, w)
+        return False
+    
+    async def get(self, key):
+        """
+        Retrieve a value, falling back to replicas if the primary fails.
+        
+        Args:
+            key (str): The key
+        
+        Returns:
+            str: The value, or None if not found
+        
+        Raises:
+            ValueError: If the key cannot be sent (see _check_key)
+        """
+        _check_key(key)
+        nodes_info = await self._get_nodes_for_key(key)
+        if not nodes_info:
+            log.warning("Failed to get nodes for key %s", key)
+            return None
+        
+        command = f"GET {key}"
+        for i, node in enumerate([nodes_info["primary"]] + nodes_info["replicas"]):
+            response = await self._send(*node.split(':'), command)
+            if response and response.startswith("VALUE"):
+                return response[6:].strip()
+            if i == 0:
+                if response == "NOT_FOUND":
+                    return None
+                self._node_cache.invalidate(key)
+        return None
+    
+    async def delete(self, key):
+        """
+        Delete a key-value pair from its primary and all replicas at once,
+        as with Client.delete. If the primary is unreachable the cached lookup
+        is dropped and the delete retried once.
+        
+        Args:
+            key (str): The key
+        
+        Returns:
+            bool: True if the primary deleted the key, False otherwise
+        
+        Raises:
+            ValueError: If the key cannot be sent (see _check_key)
+        """
+        _check_key(key)
+        for _ in range(2):
+            nodes_info = await self._get_nodes_for_key(key)
+            if not nodes_info:
+                log.warning("Failed to get nodes for key %s", key)
+                return False
+            
+            primary, replicas = nodes_info["primary"], nodes_info["replicas"]
+            responses = await asyncio.gather(*(
+                self._send(*node.split(':'), f"DELETE {key}") for node in [primary] + replicas
+            ))
+            
+            if responses[0] == "OK":
+                failed = [node for node, response in zip(replicas, responses[1:]) if response != "OK"]
+                if failed:
+                    log.warning("DELETE %s not applied on replica(s) %s", key, failed)
+                log.debug("DELETE %s [primary: %s, replicas: %s]", key, primary, replicas)
+                return True
+            
+            if responses[0] is not None:
+                break  # The primary answered; retrying won't change that
+            
+            # Primary unreachable: the cached topology may be stale
+            self._node_cache.invalidate(key)
+        
+        log.warning("DELETE %s failed: %s", key, responses[0])
+        return False
+
+
 if __name__ == "__main__":
     import argparse
     
@@ -290,6 +1152,7 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    setup_logging()
     client = Client(coordinator_host=args.host, coordinator_port=args.port)
     
     if args.command:
@@ -298,11 +1161,15 @@ if __name__ == "__main__":
         cmd = parts[0].upper()
         
         if cmd == "PUT" and len(parts) >= 3:
-            client.put(parts[1], parts[2])
+            try:
+                print("OK" if client.put(parts[1], parts[2]) else "FAILED")
+            except ValueError as e:
+                print(f"Error: {e}")
         elif cmd == "GET" and len(parts) >= 2:
-            client.get(parts[1])
+            value = client.get(parts[1])
+            print(value if value is not None else "NOT_FOUND")
         elif cmd == "DELETE" and len(parts) >= 2:
-            client.delete(parts[1])
+            print("OK" if client.delete(parts[1]) else "FAILED")
         elif cmd == "LIST_NODES":
             response = client._send_to_coordinator("LIST_NODES")
             print(response)
@@ -1,13 +1,24 @@
+import asyncio
+import heapq
+import logging
+import selectors
 import socket
 import threading
 import time
 import sys
 import os
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 # Add parent directory to path so we can import hashing
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from hashing import ConsistentHashRing
+from kvlog import setup_logging
+from wire import pack_msg, read_msg, send_msg, recv_msg
+from workers import WorkerGroup, exit_on_sigterm
+
+log = logging.getLogger("kv.coordinator")
 
 
 class Coordinator:
@@ -19,123 +30,324 @@ class Coordinator:
     - Register/unregister nodes
     - Return primary + replica nodes for a given key
     - Detect node failures via heartbeat (ping)
+    
+    All connections are served by a single asyncio event loop; commands are
+    short and CPU-bound, so they run inline without a thread per client.
+    
+    Reads use an immutable snapshot of the ring that writers swap atomically,
+    so key lookups and LIST_NODES never take self.lock.
+    
+    With num_workers > 1 (Linux/BSD), worker processes share the port via
+    SO_REUSEPORT and each keep a full copy of the ring. The parent process
+    relays every ring mutation (REGISTER_NODE, UNREGISTER_NODE, HEARTBEAT)
+    from the worker that received it to all others; worker 0 alone runs
+    the liveness scan.
     """
     
-    def __init__(self, host='127.0.0.1', port=5000):
+    NODES_CACHE_SIZE = 8192  # Max memoized key -> nodes lookups
+    HEARTBEAT_TIMEOUT = 10  # Seconds without a heartbeat before a node is dead
+    HEARTBEAT_SCAN_INTERVAL = 1  # Seconds between liveness scans
+    
+    # Commands that change the ring and must reach every worker
+    RELAYED_COMMANDS = frozenset({b"REGISTER_NODE", b"UNREGISTER_NODE", b"HEARTBEAT"})
+    
+    def __init__(self, host='127.0.0.1', port=5000, num_workers=1):
         """
         Initialize the coordinator.
         
         Args:
             host (str): Host to bind to
             port (int): Port to listen on
+            num_workers (int): Worker processes sharing the port
         """
         self.host = host
         self.port = port
+        self.num_workers = num_workers
+        self.worker_index = 0
+        self._peer = None  # Worker side of the socketpair to the parent (multi-worker only)
+        self._peer_writer = None
+        self._relaying = False  # True while applying a mutation relayed from another worker
+        self._workers = None  # WorkerGroup (multi-worker only)
         self.ring = ConsistentHashRing()
-        self.nodes = {}  # node_id -> {"host": h, "port": p, "last_heartbeat": time}
+        self.nodes = {}  # node_id -> {"host": h, "port": p, "last_heartbeat": t, "heap_time": t}
+        # (last_heartbeat seen, node_id), oldest first. A node's live entry is
+        # the one matching its "heap_time"; others are left over from an
+        # earlier registration and skipped.
+        self._heartbeat_heap = []
         self.running = False
-        self.lock = threading.Lock()
-        self.server_socket = None
+        self.lock = threading.Lock()  # Serializes writers (register/unregister/heartbeat)
+        self._snapshot = None
+        self._publish_snapshot()
+        self.server = None
+        self.loop = None
+        
+        # Command name -> handler; handlers take the split bytes command
+        self._dispatch = {
+            b"REGISTER_NODE": self._cmd_register_node,
+            b"UNREGISTER_NODE": self._cmd_unregister_node,
+            b"GET_NODES_FOR_KEY": self._cmd_get_nodes_for_key,
+            b"GET_NODES_FOR_KEYS": self._cmd_get_nodes_for_keys,
+            b"HEARTBEAT": self._cmd_heartbeat,
+            b"LIST_NODES": self._cmd_list_nodes,
+        }
     
     def start(self):
         """Start the coordinator server."""
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        num_workers = self.num_workers
+        if num_workers > 1 and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')):
+            log.warning("fork/SO_REUSEPORT unavailable, running a single worker")
+            num_workers = 1
+        
+        try:
+            if num_workers > 1:
+                self._run_workers(num_workers)
+            else:
+                asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            print("\n[Coordinator] Shutting down...")
+            self.stop()
+    
+    def _run_workers(self, num_workers):
+        """
+        Fork worker processes, then relay ring mutations between them until
+        one of them exits. Only worker 0 scans for dead nodes, so the others
+        are not left serving without it: the whole coordinator shuts down.
+        
+        Args:
+            num_workers (int): Number of workers to fork
+        """
+        self._workers = WorkerGroup("Coordinator")
+        parent_ends = []
+        for index in range(num_workers):
+            parent_end, worker_end = socket.socketpair()
+            self._workers.spawn(index, self._run_worker, index, worker_end, parent_ends + [parent_end])
+            worker_end.close()
+            parent_ends.append(parent_end)
+        
+        exit_on_sigterm()
+        print(f"[Coordinator] Started {num_workers} workers on {self.host}:{self.port}")
+        try:
+            self._relay_loop(parent_ends)
+        finally:
+            self.stop()
+            self._workers.reap()
+    
+    def _run_worker(self, index, peer, parent_ends):
+        """
+        Body of a forked worker process.
+        
+        Args:
+            index (int): Worker index
+            peer (socket.socket): Worker end of the relay channel to the parent
+            parent_ends (list): Parent ends inherited from the fork, to close
+        """
+        for sock in parent_ends:
+            sock.close()
+        self.worker_index = index
+        self._peer = peer
+        asyncio.run(self._serve())
+    
+    def _relay_loop(self, socks):
+        """
+        Forward each framed message from one worker to all the others.
+        Returns as soon as any worker exits.
+        
+        Args:
+            socks (list): Parent ends of the worker socketpairs, by worker index
+        """
+        sel = selectors.DefaultSelector()
+        for index, sock in enumerate(socks):
+            sel.register(sock, selectors.EVENT_READ, index)
+        
+        try:
+            while True:
+                for key, _ in sel.select():
+                    try:
+                        message = recv_msg(key.fileobj)
+                    except (ConnectionError, ValueError):
+                        log.error("Worker %d exited, shutting down the coordinator", key.data)
+                        return
+                    
+                    for other in sel.get_map().values():
+                        if other.fileobj is not key.fileobj:
+                            try:
+                                send_msg(other.fileobj, message)
+                            except OSError:
+                                pass  # Noticed when its own read fails
+        finally:
+            sel.close()
+            for sock in socks:
+                sock.close()
+    
+    async def _serve(self):
+        """Accept client connections until the server is closed."""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, reuse_port=self._peer is not None
+        )
         self.running = True
         
-        print(f"[Coordinator] Started on {self.host}:{self.port}")
+        if self._peer is None:
+            print(f"[Coordinator] Started on {self.host}:{self.port}")
         
-        # Start heartbeat thread
-        heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
-        heartbeat_thread.start()
+        tasks = []
+        if self.worker_index == 0:
+            # Start heartbeat task
+            tasks.append(asyncio.create_task(self._heartbeat_loop()))
+        if self._peer is not None:
+            reader, self._peer_writer = await asyncio.open_connection(sock=self._peer)
+            tasks.append(asyncio.create_task(self._peer_loop(reader)))
         
-        # Accept client connections
         try:
-            while self.running:
+            async with self.server:
+                await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _peer_loop(self, reader):
+        """
+        Apply ring mutations relayed from other workers.
+        
+        Args:
+            reader (asyncio.StreamReader): Stream from the parent process
+        """
+        try:
+            while True:
+                data = await read_msg(reader)
+                self._relaying = True
                 try:
-                    client_socket, client_addr = self.server_socket.accept()
-                    # Handle each client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, client_addr),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except Exception as e:
-                    if self.running:
-                        print(f"[Coordinator] Error accepting connection: {e}")
-        except KeyboardInterrupt:
-            print("\n[Coordinator] Shutting down...")
-            self.stop()
+                    self._process_command(data)
+                except Exception:
+                    # One bad command must not stop this worker applying the rest
+                    log.exception("Failed to apply relayed command %r", data)
+                finally:
+                    self._relaying = False
+        except asyncio.IncompleteReadError:
+            # Parent is gone: stop serving with a stale ring
+            self.server.close()
+    
+    def _relay(self, command, host, port):
+        """
+        Forward a ring mutation applied by this worker to the other workers.
+        Called only after the mutation succeeded, so peers never see a
+        command this worker rejected.
+        
+        Args:
+            command (bytes): Command name, e.g. b"REGISTER_NODE"
+            host (str): Node host
+            port (str): Node port
+        """
+        if self._peer_writer is not None and not self._relaying:
+            self._peer_writer.write(pack_msg(b" ".join(
+                [command, host.encode('ascii'), port.encode('ascii')]
+            )))
     
-    def _handle_client(self, client_socket, client_addr):
+    async def _handle_client(self, reader, writer):
         """
-        Handle a single client connection.
+        Handle a client connection.
+        A connection may carry any number of framed commands.
         
         Args:
-            client_socket: The connected socket
-            client_addr: Client address tuple
+            reader (asyncio.StreamReader): Incoming stream
+            writer (asyncio.StreamWriter): Outgoing stream
         """
+        client_addr = writer.get_extra_info('peername')
         try:
-            # Receive the command
-            data = client_socket.recv(1024).decode('utf-8').strip()
-            
-            if not data:
-                client_socket.close()
-                return
-            
-            response = self._process_command(data)
-            client_socket.sendall(response.encode('utf-8'))
+            # Serve framed commands until the client closes the connection
+            while self.running:
+                try:
+                    data = await read_msg(reader)
+                except (asyncio.IncompleteReadError, ConnectionResetError):
+                    # Reset is how one-shot clients with SO_LINGER 0 hang up
+                    break
+                
+                writer.write(pack_msg(self._process_command(data)))
+                await writer.drain()
         
         except Exception as e:
-            print(f"[Coordinator] Error handling client {client_addr}: {e}")
+            log.warning("Error handling client %s: %s", client_addr, e)
         
         finally:
-            client_socket.close()
+            writer.close()
     
-    def _process_command(self, command):
+    def _process_command(self, data: bytes) -> bytes:
         """
         Process a coordinator command.
+        Works on raw bytes: only host/port arguments are ever decoded.
         
         Args:
-            command (str): Command string
+            data (bytes): Command as received
         
         Returns:
-            str: Response string
+            bytes: Response
         """
-        parts = command.split()
+        parts = data.split()
         
         if not parts:
-            return "ERROR Invalid command"
-        
-        cmd = parts[0]
-        
-        if cmd == "REGISTER_NODE":
-            # REGISTER_NODE host port
-            if len(parts) < 3:
-                return "ERROR Invalid REGISTER_NODE format"
-            return self._register_node(parts[1], parts[2])
-        
-        elif cmd == "UNREGISTER_NODE":
-            # UNREGISTER_NODE host port
-            if len(parts) < 3:
-                return "ERROR Invalid UNREGISTER_NODE format"
-            return self._unregister_node(parts[1], parts[2])
+            return b"ERROR Invalid command"
         
-        elif cmd == "GET_NODES_FOR_KEY":
-            # GET_NODES_FOR_KEY key
-            if len(parts) < 2:
-                return "ERROR Invalid GET_NODES_FOR_KEY format"
-            return self._get_nodes_for_key(parts[1])
+        handler = self._dispatch.get(parts[0])
+        if handler is None:
+            return b"ERROR Unknown command"
+        return handler(parts)
+    
+    @staticmethod
+    def _host_port(parts: List[bytes]) -> Optional[Tuple[str, str]]:
+        """
+        Decode the host and port arguments of a node command.
         
-        elif cmd == "LIST_NODES":
-            # LIST_NODES
-            return self._list_nodes()
+        Args:
+            parts (list): The split bytes command
         
-        else:
-            return "ERROR Unknown command"
+        Returns:
+            tuple: (host, port), or None if missing or not ASCII
+        """
+        if len(parts) < 3:
+            return None
+        try:
+            return parts[1].decode('ascii'), parts[2].decode('ascii')
+        except UnicodeDecodeError:
+            return None
+    
+    def _cmd_register_node(self, parts: List[bytes]) -> bytes:
+        # REGISTER_NODE host port
+        host_port = self._host_port(parts)
+        if host_port is None:
+            return b"ERROR Invalid REGISTER_NODE format"
+        return self._register_node(*host_port).encode('utf-8')
+    
+    def _cmd_unregister_node(self, parts: List[bytes]) -> bytes:
+        # UNREGISTER_NODE host port
+        host_port = self._host_port(parts)
+        if host_port is None:
+            return b"ERROR Invalid UNREGISTER_NODE format"
+        return self._unregister_node(*host_port).encode('utf-8')
+    
+    def _cmd_get_nodes_for_key(self, parts: List[bytes]) -> bytes:
+        # GET_NODES_FOR_KEY key
+        if len(parts) < 2:
+            return b"ERROR Invalid GET_NODES_FOR_KEY format"
+        return self._get_nodes_for_key(parts[1])
+    
+    def _cmd_get_nodes_for_keys(self, parts: List[bytes]) -> bytes:
+        # GET_NODES_FOR_KEYS key1 key2 ...
+        if len(parts) < 2:
+            return b"ERROR Invalid GET_NODES_FOR_KEYS format"
+        return self._get_nodes_for_keys(parts[1:])
+    
+    def _cmd_heartbeat(self, parts: List[bytes]) -> bytes:
+        # HEARTBEAT host port
+        host_port = self._host_port(parts)
+        if host_port is None:
+            return b"ERROR Invalid HEARTBEAT format"
+        return self._heartbeat(*host_port).encode('utf-8')
+    
+    def _cmd_list_nodes(self, parts: List[bytes]) -> bytes:
+        # LIST_NODES
+        return self._list_nodes().encode('utf-8')
     
     def _register_node(self, host, port):
         """
@@ -148,21 +360,35 @@ class Coordinator:
         Returns:
             str: Response message
         """
+        try:
+            port_num = int(port)
+        except ValueError:
+            port_num = 0
+        if not 0 < port_num < 65536:
+            return f"ERROR Invalid port {port}"
         node_id = f"{host}:{port}"
         
         with self.lock:
             if node_id in self.nodes:
-                return f"WARNING Node {node_id} already registered"
-            
-            self.nodes[node_id] = {
-                "host": host,
-                "port": int(port),
-                "last_heartbeat": time.time()
-            }
-            self.ring.add_node(node_id)
-            print(f"[Coordinator] Node registered: {node_id}")
+                # A repeated registration still proves the node is alive
+                self.nodes[node_id]["last_heartbeat"] = time.monotonic()
+                response = f"WARNING Node {node_id} already registered"
+            else:
+                now = time.monotonic()
+                self.nodes[node_id] = {
+                    "host": host,
+                    "port": port_num,
+                    "last_heartbeat": now,
+                    "heap_time": now
+                }
+                heapq.heappush(self._heartbeat_heap, (now, node_id))
+                self.ring.add_node(node_id)
+                self._publish_snapshot()
+                log.info("Node registered: %s", node_id)
+                response = f"OK Node {node_id} registered"
         
-        return f"OK Node {node_id} registered"
+        self._relay(b"REGISTER_NODE", host, port)
+        return response
     
     def _unregister_node(self, host, port):
         """
@@ -183,35 +409,123 @@ class Coordinator:
             
             del self.nodes[node_id]
             self.ring.remove_node(node_id)
-            print(f"[Coordinator] Node unregistered: {node_id}")
+            self._publish_snapshot()
+            log.info("Node unregistered: %s", node_id)
         
+        self._relay(b"UNREGISTER_NODE", host, port)
         return f"OK Node {node_id} unregistered"
     
-    def _get_nodes_for_key(self, key):
+    def _heartbeat(self, host, port):
+        """
+        Record a heartbeat from a node.
+        A node that was already declared dead is registered again.
+        
+        Args:
+            host (str): Node host
+            port (str): Node port
+        
+        Returns:
+            str: Response message
+        """
+        node_id = f"{host}:{port}"
+        
+        with self.lock:
+            node_info = self.nodes.get(node_id)
+            if node_info is not None:
+                node_info["last_heartbeat"] = time.monotonic()
+        
+        if node_info is None:
+            return self._register_node(host, port)
+        self._relay(b"HEARTBEAT", host, port)
+        return "OK"
+    
+    def _get_nodes_for_key(self, key: bytes) -> bytes:
         """
         Get primary + replica nodes for a key.
         
         Args:
-            key (str): The key
+            key (bytes): The key
         
         Returns:
-            str: Response with primary and replica nodes
+            bytes: Response with primary and replica nodes
         """
         try:
-            with self.lock:
-                nodes = self.ring.get_nodes(key, count=3)
+            nodes = self._lookup_nodes(self._snapshot, key)
             
             if not nodes:
-                return "ERROR No nodes available"
+                return b"ERROR No nodes available"
             
-            response = f"PRIMARY {nodes[0]}"
-            for i in range(1, len(nodes)):
-                response += f"\nREPLICA {nodes[i]}"
+            return b"PRIMARY " + nodes[0] + b"".join(b"\nREPLICA " + node for node in nodes[1:])
+        
+        except Exception as e:
+            return f"ERROR {str(e)}".encode('utf-8')
+    
+    def _publish_snapshot(self):
+        """
+        Swap in a fresh read snapshot after a ring change.
+        Caller must hold self.lock (or be __init__).
+        
+        The snapshot is (ring snapshot, sorted node IDs, lookup memo); the memo
+        belongs to one snapshot, so a ring change implicitly invalidates it.
+        """
+        self._snapshot = (self.ring.snapshot(), tuple(sorted(self.nodes)), OrderedDict())
+    
+    def _lookup_nodes(self, snapshot: tuple, key: bytes) -> List[bytes]:
+        """
+        Get primary + replica nodes for a key, memoized per snapshot.
+        
+        Args:
+            snapshot (tuple): Value of self._snapshot
+            key (bytes): The key
+        
+        Returns:
+            list: Node IDs as bytes, starting with primary
+        """
+        ring_snapshot, _, memo = snapshot
+        nodes = memo.get(key)
+        if nodes is not None:
+            try:
+                memo.move_to_end(key)
+            except KeyError:
+                pass  # Evicted concurrently
+            return nodes
+        
+        nodes = [
+            node_id.encode('utf-8')
+            for node_id in ConsistentHashRing.get_nodes_from_snapshot(
+                ring_snapshot, key.decode('utf-8'), count=3)
+        ]
+        memo[key] = nodes
+        if len(memo) > self.NODES_CACHE_SIZE:
+            try:
+                memo.popitem(last=False)
+            except KeyError:
+                pass
+        return nodes
+    
+    def _get_nodes_for_keys(self, keys: List[bytes]) -> bytes:
+        """
+        Get primary + replica nodes for many keys from a single ring snapshot.
+        
+        Args:
+            keys (list): The keys, as bytes
+        
+        Returns:
+            bytes: One "K key primary replica..." line per key, in request order
+        """
+        try:
+            snapshot = self._snapshot
+            all_nodes = [self._lookup_nodes(snapshot, key) for key in keys]
+            
+            if not all_nodes[0]:
+                return b"ERROR No nodes available"
             
-            return response
+            return b'\n'.join(
+                b"K " + key + b" " + b" ".join(nodes) for key, nodes in zip(keys, all_nodes)
+            )
         
         except Exception as e:
-            return f"ERROR {str(e)}"
+            return f"ERROR {str(e)}".encode('utf-8')
     
     def _list_nodes(self):
         """
@@ -220,45 +534,81 @@ class Coordinator:
         Returns:
             str: Response with list of nodes
         """
-        with self.lock:
-            if not self.nodes:
-                return "OK No nodes registered"
-            
-            response = "OK Nodes:\n"
-            for node_id in sorted(self.nodes.keys()):
-                response += f"  {node_id}\n"
-            
-            return response.strip()
+        node_ids = self._snapshot[1]
+        if not node_ids:
+            return "OK No nodes registered"
+        
+        response = "OK Nodes:\n"
+        for node_id in node_ids:
+            response += f"  {node_id}\n"
+        
+        return response.strip()
     
-    def _heartbeat_loop(self):
+    async def _heartbeat_loop(self):
         """
         Periodically check if nodes are alive.
         Remove dead nodes from the ring.
         """
         while self.running:
-            time.sleep(5)  # Check every 5 seconds
+            await asyncio.sleep(self.HEARTBEAT_SCAN_INTERVAL)
             
-            with self.lock:
-                dead_nodes = []
-                for node_id, node_info in self.nodes.items():
-                    # If no heartbeat in 10 seconds, mark as dead
-                    if time.time() - node_info['last_heartbeat'] > 10:
-                        dead_nodes.append(node_id)
-                
-                for node_id in dead_nodes:
-                    host, port = node_id.split(':')
-                    self._unregister_node(host, port)
-                    print(f"[Coordinator] Node {node_id} marked as dead and removed")
+            # _unregister_node takes the lock itself
+            for node_id in self._find_dead_nodes():
+                host, port = node_id.rsplit(':', 1)
+                self._unregister_node(host, port)
+                log.warning("Node %s marked as dead and removed", node_id)
+    
+    def _find_dead_nodes(self):
+        """
+        Find nodes whose last heartbeat is older than HEARTBEAT_TIMEOUT.
+        
+        Heap entries are only refreshed when they reach the top, so a scan
+        touches expired entries only instead of every registered node.
+        
+        Returns:
+            list: Dead node IDs
+        """
+        dead_nodes = []
+        deadline = time.monotonic() - self.HEARTBEAT_TIMEOUT
+        
+        with self.lock:
+            heap = self._heartbeat_heap
+            while heap and heap[0][0] < deadline:
+                pushed_at, node_id = heapq.heappop(heap)
+                node_info = self.nodes.get(node_id)
+                if node_info is None or node_info["heap_time"] != pushed_at:
+                    continue  # Unregistered (and maybe re-registered) since the entry was pushed
+                if node_info["last_heartbeat"] < deadline:
+                    dead_nodes.append(node_id)
+                else:
+                    node_info["heap_time"] = node_info["last_heartbeat"]
+                    heapq.heappush(heap, (node_info["heap_time"], node_id))
+        
+        return dead_nodes
     
     def stop(self):
-        """Stop the coordinator server."""
+        """Stop the coordinator server (and any worker processes)."""
         self.running = False
-        if self.server_socket:
-            self.server_socket.close()
+        if self._workers is not None:
+            self._workers.stop()
+        if self.server and self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.server.close)
 
 
 if __name__ == "__main__":
-    coordinator = Coordinator(host='127.0.0.1', port=5000)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Distributed KV Store Coordinator")
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes sharing the port (Linux/BSD; 0 = one per CPU)')
+    
+    args = parser.parse_args()
+    
+    setup_logging()
+    coordinator = Coordinator(host=args.host, port=args.port,
+                              num_workers=args.workers or os.cpu_count() or 1)
     try:
         coordinator.start()
     except KeyboardInterrupt:
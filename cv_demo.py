@@ -1,9 +1,56 @@
 
 
+import errno
+import selectors
 import socket
 import time
 import sys
 
+def probe_ports(host, ports, timeout=2.0):
+    """
+    Check which ports accept TCP connections.
+    All connects are started nonblocking and awaited together, so a dead
+    port costs at most one timeout in total rather than one each.
+    
+    Args:
+        host (str): Host to probe
+        ports (list): Ports to probe
+        timeout (float): Seconds to wait for all connects
+    
+    Returns:
+        dict: port -> True if a connection was accepted
+    """
+    results = {port: False for port in ports}
+    sel = selectors.DefaultSelector()
+    
+    for port in ports:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex((host, port))
+        if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sel.register(sock, selectors.EVENT_WRITE, port)
+            continue
+        results[port] = err == 0
+        sock.close()
+    
+    # A socket becomes writable once its connect finished, either way
+    deadline = time.monotonic() + timeout
+    while sel.get_map():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        for key, _ in sel.select(remaining):
+            sock = key.fileobj
+            results[key.data] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+            sel.unregister(sock)
+            sock.close()
+    
+    # Anything left timed out
+    for key in list(sel.get_map().values()):
+        key.fileobj.close()
+    sel.close()
+    return results
+
 def test_system():
     """Test the running distributed KV store system"""
     
@@ -11,31 +58,26 @@ def test_system():
     print(" DISTRIBUTED KEY-VALUE STORE - SYSTEM VERIFICATION".center(75))
     print("="*75 + "\n")
     
+    # Probe coordinator and nodes concurrently
+    node_ports = [5001, 5002, 5003]
+    up = probe_ports('127.0.0.1', [5000] + node_ports)
+    
     # Test 1: Coordinator connectivity
     print("[1] Checking Coordinator (Port 5000)...")
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(2)
-    try:
-        sock.connect(('127.0.0.1', 5000))
+    if up[5000]:
         print("    SUCCESS: Coordinator is running")
-        sock.close()
-    except:
+    else:
         print("    FAILED: Coordinator not responding")
         return False
     
     # Test 2: Check nodes
     print("\n[2] Checking Node Servers...")
-    node_ports = [5001, 5002, 5003]
     active_nodes = 0
     for port in node_ports:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        try:
-            sock.connect(('127.0.0.1', port))
+        if up[port]:
             print(f"    Node on port {port}: ACTIVE")
-            sock.close()
             active_nodes += 1
-        except:
+        else:
             print(f"    Node on port {port}: INACTIVE")
     
     if active_nodes < 3:
@@ -1,26 +1,50 @@
 import hashlib
 import bisect
+from typing import Dict, List, Sequence, Set, Tuple
+
+# (sorted hash values, owning node ID per hash, physical node count,
+#  preference list length, preference list per hash)
+RingSnapshot = Tuple[Tuple[int, ...], Tuple[str, ...], int, int, Tuple[Tuple[str, ...], ...]]
 
 
 class ConsistentHashRing:
     """
     Consistent Hashing Ring for distributed key-value store.
     
-    Uses SHA-256 hashing and virtual nodes for better distribution.
+    Uses 64-bit BLAKE2b hashing and virtual nodes for better distribution.
     Each physical node creates VIRTUAL_NODES virtual nodes on the ring.
+    
+    The module is fully annotated so it can be compiled with mypyc (see
+    README); the pure-Python file keeps working when no build is present.
     """
     
-    VIRTUAL_NODES = 3  # Number of virtual nodes per physical node
+    VIRTUAL_NODES = 64  # Number of virtual nodes per physical node
     
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize an empty hash ring."""
-        self.ring = {}  # hash_value -> node_id
-        self.sorted_keys = []  # sorted list of hash values for binary search
-        self.nodes = set()  # set of physical node ids
+        self.ring: Dict[int, str] = {}  # hash_value -> node_id
+        self.sorted_keys: List[int] = []  # sorted list of hash values for binary search
+        self._owners: List[str] = []  # node_id owning each entry of sorted_keys (parallel list)
+        self.nodes: Set[str] = set()  # set of physical node ids
+        self._node_to_hashes: Dict[str, List[int]] = {}  # node_id -> hash values of its virtual nodes
+    
+    @staticmethod
+    def _hash_bytes(data: bytes) -> int:
+        """
+        Hash raw bytes to a 64-bit integer using BLAKE2b.
+        Ring placement only needs a uniform spread, not a cryptographic digest.
+        
+        Args:
+            data (bytes): The bytes to hash
+        
+        Returns:
+            int: Integer hash value
+        """
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
     
-    def _hash(self, key):
+    def _hash(self, key: str) -> int:
         """
-        Hash a key/node using SHA-256.
+        Hash a key/node identifier.
         
         Args:
             key (str): The key or node identifier to hash
@@ -28,10 +52,9 @@ class ConsistentHashRing:
         Returns:
             int: Integer hash value
         """
-        hash_obj = hashlib.sha256(key.encode('utf-8'))
-        return int(hash_obj.hexdigest(), 16)
+        return self._hash_bytes(key.encode('utf-8'))
     
-    def add_node(self, node_id):
+    def add_node(self, node_id: str) -> None:
         """
         Add a physical node to the ring.
         Creates VIRTUAL_NODES virtual nodes for this physical node.
@@ -44,16 +67,22 @@ class ConsistentHashRing:
         
         self.nodes.add(node_id)
         
-        # Add virtual nodes
+        # Add virtual nodes, keeping sorted_keys ordered without a full re-sort
+        hashes: List[int] = []
+        prefix = node_id.encode('utf-8') + b':virtual:'
         for i in range(self.VIRTUAL_NODES):
-            virtual_key = f"{node_id}:virtual:{i}"
-            hash_value = self._hash(virtual_key)
+            hash_value = self._hash_bytes(prefix + i.to_bytes(2, 'big'))
+            if hash_value in self.ring:
+                continue  # Hash collision: first owner keeps the slot
             self.ring[hash_value] = node_id
+            idx = bisect.bisect_left(self.sorted_keys, hash_value)
+            self.sorted_keys.insert(idx, hash_value)
+            self._owners.insert(idx, node_id)
+            hashes.append(hash_value)
         
-        # Re-sort the ring keys for binary search
-        self.sorted_keys = sorted(self.ring.keys())
+        self._node_to_hashes[node_id] = hashes
     
-    def remove_node(self, node_id):
+    def remove_node(self, node_id: str) -> None:
         """
         Remove a physical node from the ring.
         Removes all virtual nodes associated with this physical node.
@@ -67,16 +96,13 @@ class ConsistentHashRing:
         self.nodes.discard(node_id)
         
         # Remove all virtual nodes for this physical node
-        hash_values_to_remove = [
-            h for h in self.ring if self.ring[h] == node_id
-        ]
-        for h in hash_values_to_remove:
+        for h in self._node_to_hashes.pop(node_id):
             del self.ring[h]
-        
-        # Re-sort the ring keys
-        self.sorted_keys = sorted(self.ring.keys())
+            idx = bisect.bisect_left(self.sorted_keys, h)
+            del self.sorted_keys[idx]
+            del self._owners[idx]
     
-    def get_node(self, key):
+    def get_node(self, key: str) -> str:
         """
         Get the node responsible for a key.
         Uses consistent hashing: find the first node clockwise on the ring.
@@ -102,9 +128,9 @@ class ConsistentHashRing:
         if idx == len(self.sorted_keys):
             idx = 0
         
-        return self.ring[self.sorted_keys[idx]]
+        return self._owners[idx]
     
-    def get_nodes(self, key, count=3):
+    def get_nodes(self, key: str, count: int = 3) -> List[str]:
         """
         Get N nodes responsible for a key (for replication).
         Returns the key's primary node + (count-1) replicas.
@@ -122,33 +148,126 @@ class ConsistentHashRing:
         if not self.ring:
             raise ValueError("Ring is empty, no nodes available")
         
-        if len(self.nodes) < count:
-            # Return all unique nodes available
-            count = len(self.nodes)
+        if count == 1:
+            return [self.get_node(key)]
         
-        hash_value = self._hash(key)
-        idx = bisect.bisect_right(self.sorted_keys, hash_value)
+        return self._collect_nodes(
+            self.sorted_keys, self._owners, len(self.nodes), self._hash(key), count
+        )
+    
+    @staticmethod
+    def _collect_nodes(sorted_keys: Sequence[int], owners: Sequence[str], node_count: int,
+                       hash_value: int, count: int) -> List[str]:
+        """
+        Walk the ring clockwise from hash_value collecting unique physical nodes.
         
-        if idx == len(self.sorted_keys):
-            idx = 0
+        Args:
+            sorted_keys (sequence): Sorted virtual-node hash values
+            owners (sequence): Node ID owning each entry of sorted_keys
+            node_count (int): Number of physical nodes on the ring
+            hash_value (int): Hash of the key being looked up
+            count (int): Number of nodes wanted
         
-        nodes = []
-        seen = set()
+        Returns:
+            list: Node IDs, starting with primary
+        """
+        return ConsistentHashRing._walk_from(
+            owners, node_count, bisect.bisect_right(sorted_keys, hash_value), count
+        )
+    
+    @staticmethod
+    def _walk_from(owners: Sequence[str], node_count: int, idx: int, count: int) -> List[str]:
+        """
+        Collect unique physical nodes clockwise, starting at virtual node idx.
+        
+        Args:
+            owners (sequence): Node ID owning each virtual node, in ring order
+            node_count (int): Number of physical nodes on the ring
+            idx (int): Starting position (len(owners) wraps to 0)
+            count (int): Number of nodes wanted
+        
+        Returns:
+            list: Node IDs, starting with primary
+        """
+        # Asking for more nodes than exist returns every node
+        if count > node_count:
+            count = node_count
         
-        # Collect unique physical nodes starting from idx
-        for i in range(len(self.sorted_keys)):
-            current_idx = (idx + i) % len(self.sorted_keys)
-            node_id = self.ring[self.sorted_keys[current_idx]]
-            
-            if node_id not in seen:
+        # count is small, so a list beats a set for the uniqueness check.
+        # Walk idx..end, then wrap around from the start; this stops as soon
+        # as count unique nodes are found, at the latest once every physical
+        # node has been seen.
+        nodes: List[str] = []
+        for i in range(idx, len(owners)):
+            node_id = owners[i]
+            if node_id not in nodes:
                 nodes.append(node_id)
-                seen.add(node_id)
                 if len(nodes) == count:
-                    break
+                    return nodes
+        
+        for node_id in owners:
+            if node_id not in nodes:
+                nodes.append(node_id)
+                if len(nodes) == count:
+                    return nodes
         
         return nodes
     
-    def get_all_nodes(self):
+    def snapshot(self, count: int = 3) -> RingSnapshot:
+        """
+        Take an immutable copy of the ring for lock-free readers.
+        
+        Every virtual node also gets its precomputed preference list (the first
+        count unique nodes clockwise from it), so a lookup of that length is a
+        single bisect plus an index instead of a walk around the ring.
+        
+        Args:
+            count (int): Preference list length to precompute
+        
+        Returns:
+            tuple: (sorted hash values, owning node ID per hash, physical node count,
+                    count, preference list per hash)
+        """
+        owners = tuple(self._owners)
+        node_count = len(self.nodes)
+        shared: Dict[Tuple[str, ...], Tuple[str, ...]] = {}  # Identical lists share one tuple
+        preference_lists = []
+        for i in range(len(owners)):
+            nodes = tuple(self._walk_from(owners, node_count, i, count))
+            preference_lists.append(shared.setdefault(nodes, nodes))
+        
+        return tuple(self.sorted_keys), owners, node_count, count, tuple(preference_lists)
+    
+    @classmethod
+    def get_nodes_from_snapshot(cls, snapshot: RingSnapshot, key: str, count: int = 3) -> List[str]:
+        """
+        Get N nodes responsible for a key from a snapshot() result.
+        Same semantics as get_nodes, but safe to call while the live ring changes.
+        
+        Args:
+            snapshot (tuple): Result of snapshot()
+            key (str): The key to look up
+            count (int): Number of nodes to return
+        
+        Returns:
+            list: List of node IDs, starting with primary
+        
+        Raises:
+            ValueError: If the snapshot is empty
+        """
+        sorted_keys, owners, node_count, precomputed, preference_lists = snapshot
+        if not sorted_keys:
+            raise ValueError("Ring is empty, no nodes available")
+        
+        idx = bisect.bisect_right(sorted_keys, cls._hash_bytes(key.encode('utf-8')))
+        if count == precomputed:
+            if idx == len(sorted_keys):
+                idx = 0
+            return list(preference_lists[idx])
+        
+        return cls._walk_from(owners, node_count, idx, count)
+    
+    def get_all_nodes(self) -> List[str]:
         """
         Get all physical nodes in the ring.
         
@@ -0,0 +1,74 @@
+"""
+Logging setup for the Distributed Key-Value Store.
+
+Components log through child loggers of "kv" (e.g. "kv.client"). Records
+are handed to a background thread through a queue, so the request path
+never blocks on terminal I/O.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+# Silent until an entry point calls setup_logging()
+logging.getLogger("kv").addHandler(logging.NullHandler())
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(level=None):
+    """
+    Send "kv" log records to stderr via a QueueHandler/QueueListener pair.
+    
+    Args:
+        level (int): Log level; defaults to WARNING, or DEBUG when KV_DEBUG=1
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    
+    if level is None:
+        level = logging.DEBUG if os.environ.get("KV_DEBUG") == "1" else logging.WARNING
+    
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+    
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(stop_logging)
+    
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger = logging.getLogger("kv")
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """
+    Give a forked child its own queue and listener thread.
+    Threads don't survive fork(), and the parent's queue lock may have been
+    held mid-operation when the child was created.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -1,13 +1,163 @@
+import asyncio
+import logging
 import socket
+import struct
+import tempfile
 import threading
 import time
 import sys
 import os
 import argparse
+import queue
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from kvlog import setup_logging
+from wire import send_msg, recv_msg, pack_msg, read_msg, pack_values, unpack_values, MAX_MSG
+from workers import WorkerGroup, exit_on_sigterm
+
+log = logging.getLogger("kv.node")
+
+SHARD_ID_SIZE = 4  # Request id prefixed to messages between workers
+
+# Pre-encoded replies for the hot path
+_OK = b"OK"
+_NOT_FOUND = b"NOT_FOUND"
+_VALUE_PREFIX = b"VALUE "
+_ERR_UNKNOWN = b"ERROR Unknown command"
+
+# Sends to extra replicas run here so they overlap; bounded to cap thread count
+_REPL_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="replicate")
+
+
+class _ShardLink:
+    """
+    Multiplexed connection to another worker of the same node.
+    Each request carries a 4-byte id that the worker echoes back, so replies
+    may arrive in any order and a slow command never holds up a fast one.
+    """
+    
+    def __init__(self, reader, writer):
+        """
+        Args:
+            reader (asyncio.StreamReader): Stream from the worker
+            writer (asyncio.StreamWriter): Stream to the worker
+        """
+        self._writer = writer
+        self._pending = {}  # Request id -> Future
+        self._next_id = 0
+        self._reader_task = asyncio.ensure_future(self._read_loop(reader))
+    
+    def request(self, payload):
+        """
+        Send one request.
+        
+        Args:
+            payload (bytes): Command
+        
+        Returns:
+            asyncio.Future: Resolves to the response bytes
+        """
+        if self._reader_task.done():
+            raise ConnectionError("Worker link closed")
+        request_id = self._next_id
+        frame = pack_msg(request_id.to_bytes(SHARD_ID_SIZE, 'big') + payload)
+        self._next_id = (request_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(frame)
+        return future
+    
+    async def _read_loop(self, reader):
+        """Resolve pending requests as responses arrive."""
+        try:
+            while True:
+                message = await read_msg(reader)
+                future = self._pending.pop(int.from_bytes(message[:SHARD_ID_SIZE], 'big'), None)
+                if future is not None and not future.done():
+                    future.set_result(message[SHARD_ID_SIZE:])
+        except Exception as e:
+            error = e if isinstance(e, ConnectionError) else ConnectionError(str(e))
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._writer.close()
+
+
+class _ReplicaBatcher:
+    """
+    Coalesces replicated writes for one replica into REPLICATE_BATCH messages.
+    A sender thread drains everything queued while the previous batch was in
+    flight, so a lone write goes out at once and bursts share one round-trip.
+    """
+    
+    MAX_BATCH_BYTES = 1024 * 1024  # Keeps each batch well under the frame limit
+    
+    def __init__(self, replica_id, send, is_running):
+        """
+        Args:
+            replica_id (str): Replica node ID (format: "host:port")
+            send (callable): send(replica_id, payload) -> bool, True on OK
+            is_running (callable): Returns False once the node is stopping
+        """
+        self._replica_id = replica_id
+        self._send = send
+        self._is_running = is_running
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"replicate-{replica_id}")
+        self._thread.start()
+    
+    def submit(self, key, value):
+        """
+        Queue one write.
+        
+        Args:
+            key (bytes): The key
+            value (bytes): The value
+        
+        Returns:
+            Future: Resolves to True once the replica acknowledged the batch
+        """
+        future = Future()
+        self._queue.append((key + b" " + value, future))
+        self._wakeup.set()
+        return future
+    
+    def wake(self):
+        """Wake the sender so it notices the node stopping."""
+        self._wakeup.set()
+    
+    def _run(self):
+        """Send queued writes in batches until the node stops."""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._is_running():
+                while self._queue:
+                    self._queue.popleft()[1].set_result(False)
+                return
+            
+            while self._queue:
+                lines = []
+                futures = []
+                size = 0
+                while self._queue and size < self.MAX_BATCH_BYTES:
+                    line, future = self._queue.popleft()
+                    lines.append(line)
+                    futures.append(future)
+                    size += len(line) + 1
+                
+                ok = self._send(self._replica_id, b"REPLICATE_BATCH\n" + b"\n".join(lines))
+                for future in futures:
+                    future.set_result(ok)
+
 
 class Node:
     """
@@ -18,9 +168,27 @@ class Node:
     - Register itself with the coordinator
     - Handle PUT, GET, DELETE operations
     - Replicate data to replica nodes
+    - Send periodic heartbeats to the coordinator
+    
+    All client connections are served by a single asyncio event loop.
+    Commands that replicate make blocking calls to other nodes, so they run
+    on a bounded thread pool instead of stalling every other connection.
+    
+    With num_workers > 1 the node forks worker processes that share the port
+    via SO_REUSEPORT. Each worker owns the keys with crc32(key) % num_workers
+    equal to its index and forwards other keys to their owner over a local
+    Unix socket, so the coordinator still sees a single node.
     """
     
-    def __init__(self, host='127.0.0.1', port=5001, coordinator_host='127.0.0.1', coordinator_port=5000):
+    HEARTBEAT_INTERVAL = 3  # Seconds between heartbeats (coordinator timeout is 10s)
+    SHARDED_COMMANDS = frozenset({b"PUT", b"PUT_NO_REPLICATE", b"GET", b"DELETE", b"REPLICATE"})
+    REPLY_BUF_SIZE = 4096  # Receive buffer for short replies from the coordinator and replicas
+    REPLY_BUF_PREFILL = 8
+    REPLICA_TIMEOUT = 2  # Seconds to wait on a replica before giving up
+    MAX_IDLE_REPLICA_CONNS = 8  # Idle kept-alive connections per replica
+    
+    def __init__(self, host='127.0.0.1', port=5001, coordinator_host='127.0.0.1', coordinator_port=5000,
+                 num_workers=1):
         """
         Initialize a node.
         
@@ -29,6 +197,7 @@ class Node:
             port (int): Port to listen on
             coordinator_host (str): Coordinator host
             coordinator_port (int): Coordinator port
+            num_workers (int): Worker processes sharing the port (1 = no forking)
         """
         self.host = host
         self.port = port
@@ -36,29 +205,118 @@ class Node:
         self.coordinator_host = coordinator_host
         self.coordinator_port = coordinator_port
         
-        self.data = {}  # In-memory key-value store
+        # In-memory key-value store (bytes -> bytes, exactly as received).
+        # Executor threads and the event loop share it without a lock: each
+        # access is a single dict operation, atomic under the GIL.
+        self.data = {}
         self.running = False
-        self.lock = threading.Lock()
-        self.server_socket = None
+        self.server = None
+        self.loop = None
+        
+        self.num_workers = max(1, num_workers)
+        self.worker_index = 0
+        self._workers = None  # WorkerGroup (multi-worker only)
+        self._shard_sock = None  # Listening Unix socket for keys forwarded to this worker
+        self._shard_links = {}  # Worker index -> Task resolving to a _ShardLink
+        self._shard_dir = None
+        
+        # Reusable receive buffers for blocking sockets, most recently used first
+        self._buf_pool = queue.LifoQueue()
+        for _ in range(self.REPLY_BUF_PREFILL):
+            self._buf_pool.put(bytearray(self.REPLY_BUF_SIZE))
+        
+        # Runs commands that block on replication; threads start lazily, after any fork
+        self._pool = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix=f"node{port}"
+        )
+        
+        self._replica_conns = {}  # Replica ID -> idle kept-alive sockets
+        self._addr_cache = {}  # Replica ID -> (family, type, proto, sockaddr) from getaddrinfo
+        self._batchers = {}  # Replica ID -> _ReplicaBatcher, created on first write
+        self._replica_lock = threading.Lock()
+        
+        # Command name -> handler(parts, command), see _process_command
+        self._dispatch = {
+            b"PUT": self._cmd_put,
+            b"PUT_NO_REPLICATE": self._cmd_put_no_replicate,
+            b"MPUT": self._cmd_mput,
+            b"MGET": self._cmd_mget,
+            b"GET": self._cmd_get,
+            b"DELETE": self._cmd_delete,
+            b"REPLICATE": self._cmd_replicate,
+            b"REPLICATE_BATCH": self._cmd_replicate_batch,
+            b"INFO": self._cmd_info,
+        }
+    
+    def _recv_reply(self, sock):
+        """
+        Receive one framed reply into a pooled buffer and decode it.
+        
+        Args:
+            sock: Connected socket
+        
+        Returns:
+            str: Reply text
+        """
+        try:
+            buf = self._buf_pool.get_nowait()
+        except queue.Empty:
+            buf = bytearray(self.REPLY_BUF_SIZE)
+        try:
+            return str(recv_msg(sock, buf), 'utf-8').strip()
+        finally:
+            self._buf_pool.put(buf)
     
     def register_with_coordinator(self):
         """Register this node with the coordinator."""
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # One-shot socket: reset on close instead of leaving it in TIME_WAIT
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
             sock.connect((self.coordinator_host, self.coordinator_port))
             
             command = f"REGISTER_NODE {self.host} {self.port}"
-            sock.sendall(command.encode('utf-8'))
+            send_msg(sock, command.encode('utf-8'))
             
-            response = sock.recv(1024).decode('utf-8').strip()
+            response = self._recv_reply(sock)
             print(f"[Node {self.port}] Coordinator response: {response}")
             sock.close()
             
             return True
         except Exception as e:
-            print(f"[Node {self.port}] Failed to register with coordinator: {e}")
+            log.warning("Failed to register with coordinator: %s", e)
             return False
     
+    def _heartbeat_loop(self):
+        """
+        Periodically tell the coordinator this node is alive.
+        Heartbeats reuse one kept-alive connection, reconnecting after errors.
+        """
+        command = f"HEARTBEAT {self.host} {self.port}".encode('utf-8')
+        buf = bytearray(self.REPLY_BUF_SIZE)
+        sock = None
+        
+        while self.running:
+            time.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                if sock is None:
+                    sock = socket.create_connection(
+                        (self.coordinator_host, self.coordinator_port), timeout=5
+                    )
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                send_msg(sock, command)
+                recv_msg(sock, buf)
+            except Exception as e:
+                log.warning("Heartbeat failed: %s", e)
+                if sock is not None:
+                    sock.close()
+                    sock = None
+        
+        if sock is not None:
+            sock.close()
+    
     def start(self):
         """Start the node server."""
         # Register with coordinator
@@ -66,149 +324,509 @@ class Node:
             print(f"[Node {self.port}] Failed to register, exiting")
             return
         
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        num_workers = self.num_workers
+        if num_workers > 1 and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')
+                                    and hasattr(socket, 'AF_UNIX')):
+            log.warning("fork/SO_REUSEPORT unavailable, running a single worker")
+            num_workers = self.num_workers = 1
+        
+        try:
+            if num_workers > 1:
+                self._run_workers(num_workers)
+            else:
+                asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            print(f"\n[Node {self.port}] Shutting down...")
+            self.stop()
+    
+    def _run_workers(self, num_workers):
+        """
+        Fork worker processes and wait until one of them exits.
+        The shard sockets are bound before forking, so a worker can forward
+        to any other as soon as it starts. Each worker owns a share of the
+        keys (and worker 0 sends the heartbeats), so when one exits the whole
+        node shuts down and the coordinator fails its keys over.
+        
+        Args:
+            num_workers (int): Number of workers to fork
+        """
+        self._shard_dir = tempfile.mkdtemp(prefix=f"kv-node-{self.port}-")
+        shard_socks = []
+        for index in range(num_workers):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self._shard_path(index))
+            sock.listen(128)
+            shard_socks.append(sock)
+        
+        self._workers = WorkerGroup(f"Node {self.port}")
+        for index in range(num_workers):
+            self._workers.spawn(index, self._run_worker, index, shard_socks)
+        
+        for sock in shard_socks:
+            sock.close()
+        
+        exit_on_sigterm()
+        print(f"[Node {self.port}] Started {num_workers} workers on {self.host}:{self.port}")
+        try:
+            self._workers.wait()
+        finally:
+            self.stop()
+            self._workers.reap()
+            for index in range(num_workers):
+                try:
+                    os.unlink(self._shard_path(index))
+                except OSError:
+                    pass
+            os.rmdir(self._shard_dir)
+    
+    def _run_worker(self, index, shard_socks):
+        """
+        Body of a forked worker process.
+        
+        Args:
+            index (int): Worker index
+            shard_socks (list): Shard sockets of all workers, by index
+        """
+        # Keep only our own shard socket
+        for other, sock in enumerate(shard_socks):
+            if other != index:
+                sock.close()
+        self.worker_index = index
+        self._shard_sock = shard_socks[index]
+        asyncio.run(self._serve())
+    
+    def _shard_path(self, index):
+        """
+        Get the Unix socket path of a worker's shard server.
+        
+        Args:
+            index (int): Worker index
+        
+        Returns:
+            str: Socket path
+        """
+        return os.path.join(self._shard_dir, f"worker{index}.sock")
+    
+    async def _serve(self):
+        """Accept client connections until the server is closed."""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=1024,
+            reuse_port=self.num_workers > 1
+        )
         self.running = True
         
-        print(f"[Node {self.port}] Started on {self.host}:{self.port}")
+        shard_server = None
+        if self._shard_sock is not None:
+            shard_server = await asyncio.start_unix_server(self._handle_shard, sock=self._shard_sock)
+            self.loop.add_reader(self._workers.lifeline, self._parent_exited)
+        else:
+            print(f"[Node {self.port}] Started on {self.host}:{self.port}")
+        
+        if self.worker_index == 0:
+            # Start heartbeat thread
+            heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            heartbeat_thread.start()
         
         try:
+            async with self.server:
+                await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if shard_server is not None:
+                shard_server.close()
+    
+    def _parent_exited(self):
+        """Stop serving once the parent process is gone (its lifeline read EOF)."""
+        self.loop.remove_reader(self._workers.lifeline)
+        log.warning("Parent process exited, stopping worker %d", self.worker_index)
+        self.server.close()
+    
+    async def _handle_client(self, reader, writer):
+        """
+        Handle a client connection.
+        A connection may carry any number of framed commands; they are
+        answered strictly in order.
+        
+        Args:
+            reader (asyncio.StreamReader): Incoming stream
+            writer (asyncio.StreamWriter): Outgoing stream
+        """
+        # asyncio already sets TCP_NODELAY; keepalive drops clients that vanish
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        
+        try:
+            # Serve framed commands until the client closes the connection
             while self.running:
                 try:
-                    client_socket, client_addr = self.server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, client_addr),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except Exception as e:
-                    if self.running:
-                        print(f"[Node {self.port}] Error accepting connection: {e}")
-        except KeyboardInterrupt:
-            print(f"\n[Node {self.port}] Shutting down...")
-            self.stop()
+                    data = (await read_msg(reader)).strip()
+                except asyncio.IncompleteReadError:
+                    break
+                
+                if self.num_workers > 1:
+                    response = await self._route(data)
+                else:
+                    response = await self._execute(data)
+                if len(response) > MAX_MSG:
+                    # e.g. an MGET over many large values; the client can split the batch
+                    response = b"ERROR Response exceeds frame size limit"
+                writer.write(pack_msg(response))
+                await writer.drain()
+        
+        except Exception as e:
+            log.warning("Error handling client: %s", e)
+        
+        finally:
+            writer.close()
     
-    def _handle_client(self, client_socket, client_addr):
+    async def _handle_shard(self, reader, writer):
         """
-        Handle a single client connection.
+        Serve commands forwarded by other workers for keys this worker owns.
+        Each command runs as its own task and is answered as soon as it
+        finishes, tagged with the request id it arrived with.
         
         Args:
-            client_socket: The connected socket
-            client_addr: Client address tuple
+            reader (asyncio.StreamReader): Incoming stream
+            writer (asyncio.StreamWriter): Outgoing stream
         """
+        tasks = set()
         try:
-            data = client_socket.recv(1024).decode('utf-8').strip()
+            while self.running:
+                try:
+                    message = await read_msg(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                task = asyncio.ensure_future(self._answer_shard(message, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except Exception as e:
+            log.warning("Error handling worker link: %s", e)
+        finally:
+            if tasks:
+                await asyncio.wait(tasks)
+            writer.close()
+    
+    async def _answer_shard(self, message, writer):
+        """
+        Run one forwarded command and write its tagged reply.
+        
+        Args:
+            message (bytes): Request id followed by the command
+            writer (asyncio.StreamWriter): Outgoing stream
+        """
+        request_id = message[:SHARD_ID_SIZE]
+        try:
+            response = await self._execute(message[SHARD_ID_SIZE:])
+        except Exception as e:
+            response = f"ERROR {e}".encode('utf-8')
+        if len(response) + SHARD_ID_SIZE > MAX_MSG:
+            response = b"ERROR Response exceeds frame size limit"
+        if not writer.is_closing():
+            writer.write(pack_msg(request_id + response))
+    
+    async def _execute(self, command):
+        """
+        Run a command against this worker's own data.
+        
+        Args:
+            command (bytes): Command as received
+        
+        Returns:
+            bytes: Response
+        """
+        if self._replicates(command):
+            return await self.loop.run_in_executor(self._pool, self._process_command, command)
+        return self._process_command(command)
+    
+    def _owner(self, key):
+        """
+        Get the index of the worker that owns a key.
+        crc32 rather than hash(), which is salted differently in each process.
+        
+        Args:
+            key (bytes): Key
+        
+        Returns:
+            int: Worker index
+        """
+        return zlib.crc32(key) % self.num_workers
+    
+    async def _run_on(self, index, command):
+        """
+        Run a command on the given worker, locally or over its shard link.
+        
+        Args:
+            index (int): Worker index
+            command (bytes): Command
+        
+        Returns:
+            bytes: Response
+        """
+        if index == self.worker_index:
+            return await self._execute(command)
+        
+        link = self._shard_links.get(index)
+        if link is None:
+            link = self._shard_links[index] = asyncio.ensure_future(self._open_shard_link(index))
+        try:
+            return await (await link).request(command)
+        except (ConnectionError, OSError) as e:
+            if self._shard_links.get(index) is link:
+                del self._shard_links[index]
+            return f"ERROR Worker {index} unavailable: {e}".encode('utf-8')
+        except ValueError as e:
+            return f"ERROR {e}".encode('utf-8')
+    
+    async def _open_shard_link(self, index):
+        """
+        Connect to another worker's shard server.
+        
+        Args:
+            index (int): Worker index
+        
+        Returns:
+            _ShardLink: The new link
+        """
+        reader, writer = await asyncio.open_unix_connection(self._shard_path(index))
+        return _ShardLink(reader, writer)
+    
+    async def _route(self, command):
+        """
+        Run a command on the worker(s) owning its keys.
+        Batches are split per owner and merged; INFO sums every worker's keys.
+        
+        Args:
+            command (bytes): Command
+        
+        Returns:
+            bytes: Response
+        """
+        parts = command.split(None, 2)
+        if not parts:
+            return await self._execute(command)
+        cmd = parts[0]
+        
+        if cmd in self.SHARDED_COMMANDS and len(parts) >= 2:
+            return await self._run_on(self._owner(parts[1]), command)
+        
+        if cmd == b"MGET":
+            keys = command.split()[1:]
+            groups = {}
+            for pos, key in enumerate(keys):
+                groups.setdefault(self._owner(key), []).append(pos)
+            if len(groups) <= 1:
+                return await self._run_on(next(iter(groups), self.worker_index), command)
             
-            if not data:
-                client_socket.close()
-                return
+            owners = list(groups)
+            replies = await asyncio.gather(*(
+                self._run_on(index, b"MGET " + b" ".join([keys[pos] for pos in groups[index]]))
+                for index in owners
+            ))
+            values = [None] * len(keys)
+            for index, reply in zip(owners, replies):
+                if reply.startswith(b"ERROR"):
+                    return reply
+                for pos, value in zip(groups[index], unpack_values(reply)):
+                    values[pos] = value
+            return pack_values(values)
+        
+        if cmd == b"MPUT" or cmd == b"REPLICATE_BATCH":
+            header, _, body = command.partition(b'\n')
+            groups = {}
+            for line in body.split(b'\n'):
+                if line:
+                    groups.setdefault(self._owner(line.split(b' ', 1)[0]), []).append(line)
+            if len(groups) <= 1:
+                return await self._run_on(next(iter(groups), self.worker_index), command)
             
-            response = self._process_command(data)
-            client_socket.sendall(response.encode('utf-8'))
+            replies = await asyncio.gather(*(
+                self._run_on(index, header + b'\n' + b'\n'.join(lines))
+                for index, lines in groups.items()
+            ))
+            for reply in replies:
+                if not reply.startswith(b"OK"):
+                    return reply
+            return replies[0]
         
-        except Exception as e:
-            print(f"[Node {self.port}] Error handling client: {e}")
+        if cmd == b"INFO":
+            replies = await asyncio.gather(*(
+                self._run_on(index, command) for index in range(self.num_workers)
+            ))
+            total = 0
+            for reply in replies:
+                if not reply.startswith(b"OK"):
+                    return reply
+                total += int(reply.rsplit(b"keys=", 1)[1])
+            return f"OK Node {self.node_id} keys={total}".encode('utf-8')
         
-        finally:
-            client_socket.close()
+        return await self._execute(command)
+    
+    @staticmethod
+    def _replicates(command):
+        """
+        Check whether a command will block on replication to other nodes.
+        
+        Args:
+            command (bytes): Command
+        
+        Returns:
+            bool: True for PUT/MPUT carrying a replica list
+        """
+        if command.startswith(b"PUT "):
+            return b'\n' in command
+        return command.startswith(b"MPUT ")
     
     def _process_command(self, command):
         """
         Process a command.
+        Works on raw bytes: keys and values are stored exactly as received,
+        so nothing is decoded or re-encoded on the request path.
         
         Args:
-            command (str): Command string
+            command (bytes): Command as received
         
         Returns:
-            str: Response string
+            bytes: Response
         """
-        parts = command.split(maxsplit=2)
+        parts = command.split(None, 2)
         
         if not parts:
-            return "ERROR Invalid command"
+            return b"ERROR Invalid command"
         
-        cmd = parts[0]
+        handler = self._dispatch.get(parts[0])
+        if handler is None:
+            return _ERR_UNKNOWN
+        return handler(parts, command)
+    
+    def _cmd_put(self, parts, command):
+        # PUT key value[\nreplica_nodes]
+        # The replica list sits on its own line since values may contain spaces
+        if len(parts) < 3:
+            return b"ERROR Invalid PUT format"
+        key = parts[1]
+        value, _, replicas = parts[2].partition(b'\n')
+        self._put(key, value)
         
-        if cmd == "PUT":
-            if len(parts) < 3:
-                return "ERROR Invalid PUT format"
-            key, value = parts[1], parts[2]
-            self._put(key, value)
-            
-            # Replicate to other nodes (if specified in command)
-            # Format: PUT key value [replica_nodes]
-            if len(parts) > 3:
-                replicas = parts[3].split(',')
-                self._replicate_to_nodes(key, value, replicas)
-            
-            return "OK"
-        
-        elif cmd == "GET":
-            if len(parts) < 2:
-                return "ERROR Invalid GET format"
-            key = parts[1]
-            value = self._get(key)
-            if value is not None:
-                return f"VALUE {value}"
-            else:
-                return "NOT_FOUND"
-        
-        elif cmd == "DELETE":
-            if len(parts) < 2:
-                return "ERROR Invalid DELETE format"
-            key = parts[1]
-            self._delete(key)
-            return "OK"
-        
-        elif cmd == "REPLICATE":
-            # Internal replication command (from primary node)
-            if len(parts) < 3:
-                return "ERROR Invalid REPLICATE format"
-            key, value = parts[1], parts[2]
+        # Replicate to other nodes (if specified in command)
+        if replicas:
+            self._replicate_to_nodes(key, value, replicas.decode('ascii').split(','))
+        
+        return _OK
+    
+    def _cmd_put_no_replicate(self, parts, command):
+        # PUT_NO_REPLICATE key value
+        # Sent by clients that write to every replica themselves (quorum writes)
+        if len(parts) < 3:
+            return b"ERROR Invalid PUT_NO_REPLICATE format"
+        self._put(parts[1], parts[2])
+        return _OK
+    
+    @staticmethod
+    def _parse_items(body):
+        """
+        Parse the "key value" lines of a batch command.
+        
+        Args:
+            body (bytes): Everything after the command's first line
+        
+        Returns:
+            list: (key, value) pairs, or None if a line is malformed
+        """
+        items = []
+        for line in body.split(b'\n') if body else ():
+            key, _, value = line.partition(b' ')
+            if not key or not value:
+                return None
+            items.append((key, value))
+        return items
+    
+    def _cmd_mput(self, parts, command):
+        # MPUT [replica_nodes]\nkey value\nkey value...
+        header, _, body = command.partition(b'\n')
+        items = self._parse_items(body)
+        if items is None:
+            return b"ERROR Invalid MPUT format"
+        
+        for key, value in items:
             self._put(key, value)
-            return "OK"
         
-        elif cmd == "INFO":
-            # Return node info
-            with self.lock:
-                return f"OK Node {self.node_id} keys={len(self.data)}"
+        # Forward the batch (without replica list) so each replica is one round-trip
+        replicas = header.split()[1:]
+        if replicas:
+            self._send_to_replicas(replicas[0].decode('ascii').split(','), b"MPUT\n" + body)
         
-        else:
-            return "ERROR Unknown command"
+        return _OK
+    
+    def _cmd_mget(self, parts, command):
+        # MGET key1 key2 ... -> binary [n][len][value]... in key order
+        keys = command.split()[1:]
+        if not keys:
+            return b"ERROR Invalid MGET format"
+        return pack_values([self._get(key) for key in keys])
+    
+    def _cmd_get(self, parts, command):
+        # GET key
+        if len(parts) < 2:
+            return b"ERROR Invalid GET format"
+        value = self._get(parts[1])
+        if value is not None:
+            return _VALUE_PREFIX + value
+        return _NOT_FOUND
+    
+    def _cmd_delete(self, parts, command):
+        # DELETE key
+        if len(parts) < 2:
+            return b"ERROR Invalid DELETE format"
+        self._delete(parts[1])
+        return _OK
+    
+    def _cmd_replicate(self, parts, command):
+        # REPLICATE key value (internal, from the primary node)
+        if len(parts) < 3:
+            return b"ERROR Invalid REPLICATE format"
+        self._put(parts[1], parts[2])
+        return _OK
+    
+    def _cmd_replicate_batch(self, parts, command):
+        # REPLICATE_BATCH\nkey value\nkey value... (internal, coalesced by the primary)
+        items = self._parse_items(command.partition(b'\n')[2])
+        if items is None:
+            return b"ERROR Invalid REPLICATE_BATCH format"
+        self.data.update(items)
+        log.debug("REPLICATE_BATCH %d keys", len(items))
+        return _OK
+    
+    def _cmd_info(self, parts, command):
+        # INFO
+        return f"OK Node {self.node_id} keys={len(self.data)}".encode('utf-8')
     
     def _put(self, key, value):
         """
         Store a key-value pair.
         
         Args:
-            key (str): The key
-            value (str): The value
+            key (bytes): The key
+            value (bytes): The value
         """
-        with self.lock:
-            self.data[key] = value
-        print(f"[Node {self.port}] PUT {key} = {value}")
+        self.data[key] = value
+        log.debug("PUT %s = %s", key, value)
     
     def _get(self, key):
         """
         Retrieve a value by key.
         
         Args:
-            key (str): The key
+            key (bytes): The key
         
         Returns:
-            str: The value, or None if not found
+            bytes: The value, or None if not found
         """
-        with self.lock:
-            value = self.data.get(key)
-        
-        if value is not None:
-            print(f"[Node {self.port}] GET {key} = {value}")
-        else:
-            print(f"[Node {self.port}] GET {key} = NOT_FOUND")
-        
+        value = self.data.get(key)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("GET %s = %s", key, "NOT_FOUND" if value is None else value)
         return value
     
     def _delete(self, key):
@@ -216,52 +834,192 @@ class Node:
         Delete a key-value pair.
         
         Args:
-            key (str): The key
+            key (bytes): The key
         """
-        with self.lock:
-            if key in self.data:
-                del self.data[key]
-                print(f"[Node {self.port}] DELETE {key}")
-            else:
-                print(f"[Node {self.port}] DELETE {key} (not found)")
+        found = self.data.pop(key, None) is not None
+        log.debug("DELETE %s%s", key, "" if found else " (not found)")
     
     def _replicate_to_nodes(self, key, value, replica_node_ids):
         """
         Replicate a key-value pair to replica nodes.
+        Writes are queued on each replica's batcher, which coalesces
+        concurrent PUTs; this returns once every replica acknowledged or
+        REPLICA_TIMEOUT passed.
         
         Args:
-            key (str): The key
-            value (str): The value
+            key (bytes): The key
+            value (bytes): The value
             replica_node_ids (list): List of replica node IDs (format: "host:port")
         """
-        for replica_id in replica_node_ids:
+        futures = [self._batcher(replica_id).submit(key, value) for replica_id in replica_node_ids]
+        wait(futures, timeout=self.REPLICA_TIMEOUT)
+        if log.isEnabledFor(logging.DEBUG):
+            for replica_id, future in zip(replica_node_ids, futures):
+                if future.done() and future.result():
+                    log.debug("Replicated %s to %s", key, replica_id)
+    
+    def _batcher(self, replica_id):
+        """
+        Get the write batcher for a replica, starting it on first use.
+        
+        Args:
+            replica_id (str): Replica node ID (format: "host:port")
+        
+        Returns:
+            _ReplicaBatcher: The batcher
+        """
+        batcher = self._batchers.get(replica_id)
+        if batcher is None:
+            with self._replica_lock:
+                batcher = self._batchers.get(replica_id)
+                if batcher is None:
+                    batcher = self._batchers[replica_id] = _ReplicaBatcher(
+                        replica_id, self._send_to_replica, lambda: self.running
+                    )
+        return batcher
+    
+    def _send_to_replicas(self, replica_ids, command):
+        """
+        Send a command to several replicas at once.
+        The first send runs on the calling thread, the rest on _REPL_POOL,
+        so latency is one round-trip rather than one per replica.
+        
+        Args:
+            replica_ids (list): Replica node IDs (format: "host:port")
+            command (bytes): Command to send
+        
+        Returns:
+            list: Per replica, True if acknowledged, False if failed, or
+            None if still pending after REPLICA_TIMEOUT
+        """
+        if not replica_ids:
+            return []
+        futures = [_REPL_POOL.submit(self._send_to_replica, replica_id, command)
+                   for replica_id in replica_ids[1:]]
+        results = [self._send_to_replica(replica_ids[0], command)]
+        if futures:
+            wait(futures, timeout=self.REPLICA_TIMEOUT)
+            results.extend(future.result() if future.done() else None for future in futures)
+        return results
+    
+    def _send_to_replica(self, replica_id, payload):
+        """
+        Send a replication command to a replica node.
+        
+        Args:
+            replica_id (str): Replica node ID (format: "host:port")
+            payload (bytes): Command to send
+        
+        Returns:
+            bool: True if the replica acknowledged with OK
+        """
+        try:
+            sock, reused = self._get_replica_sock(replica_id)
             try:
-                host, port = replica_id.split(':')
-                port = int(port)
-                
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                sock.connect((host, port))
-                
-                command = f"REPLICATE {key} {value}"
-                sock.sendall(command.encode('utf-8'))
-                
-                response = sock.recv(1024).decode('utf-8').strip()
+                send_msg(sock, payload)
+                response = self._recv_reply(sock)
+            except ConnectionError:
                 sock.close()
-                
-                if response == "OK":
-                    print(f"[Node {self.port}] Replicated {key} to {replica_id}")
-                else:
-                    print(f"[Node {self.port}] Failed to replicate to {replica_id}: {response}")
+                if not reused:
+                    raise
+                # Kept-alive connection went stale (e.g. replica restarted); retry once
+                sock, _ = self._get_replica_sock(replica_id, fresh=True)
+                send_msg(sock, payload)
+                response = self._recv_reply(sock)
+            except BaseException:
+                sock.close()
+                raise
+            self._release_replica_sock(replica_id, sock)
             
-            except Exception as e:
-                print(f"[Node {self.port}] Error replicating to {replica_id}: {e}")
+            if response == "OK":
+                return True
+            log.warning("Failed to replicate to %s: %s", replica_id, response)
+        
+        except Exception as e:
+            log.warning("Error replicating to %s: %s", replica_id, e)
+        
+        return False
+    
+    def _get_replica_sock(self, replica_id, fresh=False):
+        """
+        Check out a connection to a replica, reusing an idle one if possible.
+        
+        Args:
+            replica_id (str): Replica node ID (format: "host:port")
+            fresh (bool): Skip idle connections and always connect
+        
+        Returns:
+            tuple: (socket, reused)
+        """
+        if not fresh:
+            with self._replica_lock:
+                idle = self._replica_conns.get(replica_id)
+                if idle:
+                    return idle.pop(), True
+        
+        family, socktype, proto, sockaddr = self._replica_addr(replica_id)
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.settimeout(self.REPLICA_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.connect(sockaddr)
+        except OSError:
+            sock.close()
+            # Resolve again next time in case the address changed
+            self._addr_cache.pop(replica_id, None)
+            raise
+        return sock, False
+    
+    def _replica_addr(self, replica_id):
+        """
+        Resolve a replica ID once and cache the result.
+        
+        Args:
+            replica_id (str): Replica node ID (format: "host:port")
+        
+        Returns:
+            tuple: (family, type, proto, sockaddr) for socket() and connect()
+        """
+        addr = self._addr_cache.get(replica_id)
+        if addr is None:
+            host, port = replica_id.rsplit(':', 1)
+            family, socktype, proto, _, sockaddr = socket.getaddrinfo(
+                host, int(port), socket.AF_UNSPEC, socket.SOCK_STREAM
+            )[0]
+            addr = self._addr_cache[replica_id] = (family, socktype, proto, sockaddr)
+        return addr
+    
+    def _release_replica_sock(self, replica_id, sock):
+        """
+        Return a healthy connection to the idle pool.
+        
+        Args:
+            replica_id (str): Replica node ID
+            sock: Socket checked out with _get_replica_sock
+        """
+        with self._replica_lock:
+            idle = self._replica_conns.setdefault(replica_id, [])
+            if len(idle) < self.MAX_IDLE_REPLICA_CONNS and self.running:
+                idle.append(sock)
+                return
+        sock.close()
     
     def stop(self):
-        """Stop the node server."""
+        """Stop the node server (and any worker processes)."""
         self.running = False
-        if self.server_socket:
-            self.server_socket.close()
+        with self._replica_lock:
+            for idle in self._replica_conns.values():
+                for sock in idle:
+                    sock.close()
+            self._replica_conns.clear()
+            for batcher in self._batchers.values():
+                batcher.wake()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._workers is not None:
+            self._workers.stop()
+        if self.server and self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.server.close)
 
 
 if __name__ == "__main__":
@@ -272,14 +1030,20 @@ if __name__ == "__main__":
     parser.add_argument('--id', default=None, help='Node ID (optional)')
     parser.add_argument('--coordinator-host', default='127.0.0.1', help='Coordinator host')
     parser.add_argument('--coordinator-port', type=int, default=5000, help='Coordinator port')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes sharing the port (Linux/BSD; 0 = one per CPU)')
     
     args = parser.parse_args()
+    setup_logging()
     
     port = args.port
     coord_host = args.coordinator_host
     coord_port = args.coordinator_port
     
-    node = Node(host='127.0.0.1', port=port, coordinator_host=coord_host, coordinator_port=coord_port)
+    workers = args.workers or os.cpu_count() or 1
+    
+    node = Node(host='127.0.0.1', port=port, coordinator_host=coord_host, coordinator_port=coord_port,
+                num_workers=workers)
     try:
         node.start()
     except KeyboardInterrupt:
@@ -4,15 +4,88 @@ Test script for the Distributed Key-Value Store.
 Runs automated tests to verify functionality.
 """
 
+import asyncio
+import functools
+import io
 import subprocess
-import time
 import sys
 import os
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from client.client import Client
+from client.client import Client, AsyncClient
+from hashing import ConsistentHashRing
+
+
+@functools.lru_cache(maxsize=1)
+def _client():
+    """
+    Get the Client shared by the tests, so they reuse its node cache and
+    kept-alive connections instead of starting cold each time.
+    
+    Returns:
+        Client: Client for the local test cluster
+    """
+    return Client(coordinator_host='127.0.0.1', coordinator_port=5000)
+
+
+class _ThreadOutput:
+    """
+    sys.stdout stand-in that gives each capturing thread its own buffer,
+    so tests running in parallel don't interleave their output.
+    """
+    
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Stream for threads that aren't capturing
+        """
+        self.stream = stream
+        self._local = threading.local()
+    
+    def capture(self):
+        """
+        Start buffering the calling thread's output.
+        
+        Returns:
+            io.StringIO: The buffer
+        """
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+
+def _safe_call(output, test_name, test_func):
+    """
+    Run one test, capturing its output and turning a crash into a failure.
+    
+    Args:
+        output (_ThreadOutput): Installed sys.stdout
+        test_name (str): Name for the crash message
+        test_func (callable): Test to run
+    
+    Returns:
+        tuple: (passed, captured output)
+    """
+    buffer = output.capture()
+    try:
+        result = test_func()
+    except Exception as e:
+        print(f"\n❌ Test '{test_name}' crashed with error: {e}")
+        traceback.print_exc(file=sys.stdout)
+        result = False
+    return result, buffer.getvalue()
 
 
 def test_basic_operations():
@@ -21,7 +94,7 @@ def test_basic_operations():
     print("TEST 1: Basic Operations (PUT, GET, DELETE)")
     print("="*50)
     
-    client = Client(coordinator_host='127.0.0.1', coordinator_port=5000)
+    client = _client()
     
     # Test PUT
     print("\n[Test] PUT key1 = value1")
@@ -64,7 +137,7 @@ def test_multiple_keys():
     print("TEST 2: Multiple Keys")
     print("="*50)
     
-    client = Client(coordinator_host='127.0.0.1', coordinator_port=5000)
+    client = _client()
     
     test_data = {
         "user:1": "Alice",
@@ -103,8 +176,6 @@ def test_consistent_hashing():
     print("TEST 3: Consistent Hashing Distribution")
     print("="*50)
     
-    from hashing import ConsistentHashRing
-    
     ring = ConsistentHashRing()
     
     # Add nodes
@@ -117,13 +188,7 @@ def test_consistent_hashing():
     # Test key distribution
     print("\n[Test] Checking key distribution...")
     keys = [f"key:{i}" for i in range(100)]
-    distribution = {}
-    
-    for key in keys:
-        node = ring.get_node(key)
-        if node not in distribution:
-            distribution[node] = 0
-        distribution[node] += 1
+    distribution = Counter(ring.get_node(key) for key in keys)
     
     print("Distribution:")
     for node, count in sorted(distribution.items()):
@@ -131,10 +196,11 @@ def test_consistent_hashing():
         print(f"  {node}: {count} keys ({percentage:.1f}%)")
     
     # Check that distribution is relatively balanced (not all on one node)
-    min_keys = min(distribution.values())
-    max_keys = max(distribution.values())
+    ranked = distribution.most_common()
+    max_keys = ranked[0][1]
     
-    if min_keys == 0:
+    # Nodes that got no keys are absent from the Counter
+    if len(ranked) < len(nodes):
         print("❌ Some nodes have 0 keys (bad distribution)")
         return False
     
@@ -152,7 +218,7 @@ def test_replication():
     print("TEST 4: Replication")
     print("="*50)
     
-    client = Client(coordinator_host='127.0.0.1', coordinator_port=5000)
+    client = _client()
     
     print("\n[Test] Storing key with replication...")
     key = "replicated_key"
@@ -186,6 +252,114 @@ def test_replication():
         return False
     
     print("✅ Replicated value retrieved successfully")
+    
+    # DELETE fans out, so no replica may still hold the value
+    print("\n[Test] Deleting replicated key...")
+    if not client.delete(key):
+        print("❌ Failed to delete key")
+        return False
+    for node in [primary] + replicas:
+        host, port = node.split(':')
+        response = client._send_to_node(host, port, f"GET {key}")
+        if response != "NOT_FOUND":
+            print(f"❌ {node} still returns {response}")
+            return False
+    
+    print("✅ Key deleted from primary and replicas")
+    return True
+
+
+def test_batch_operations():
+    """Test multi_put/multi_get batching across nodes."""
+    print("\n" + "="*50)
+    print("TEST 5: Batch Operations (MPUT, MGET)")
+    print("="*50)
+    
+    client = _client()
+    
+    test_data = {f"batch:{i}": f"value {i}" for i in range(20)}
+    
+    print("\n[Test] multi_put 20 keys...")
+    if not client.multi_put(test_data):
+        print("❌ multi_put failed")
+        return False
+    print("✅ multi_put succeeded")
+    
+    print("\n[Test] multi_get 20 keys + 1 missing key...")
+    keys = list(test_data) + ["batch:missing"]
+    values = client.multi_get(keys)
+    expected = list(test_data.values()) + [None]
+    if values != expected:
+        print(f"❌ multi_get returned {values}")
+        return False
+    print("✅ multi_get returned all values in order")
+    
+    return True
+
+
+def test_quorum_write():
+    """Test AsyncClient.put_quorum writes to primary and replicas in parallel."""
+    print("\n" + "="*50)
+    print("TEST 6: Quorum Write (PUT_NO_REPLICATE fan-out)")
+    print("="*50)
+    
+    async def run():
+        client = AsyncClient(coordinator_host='127.0.0.1', coordinator_port=5000)
+        try:
+            print("\n[Test] put_quorum quorum:key = quorum value (w=2)")
+            if not await client.put_quorum("quorum:key", "quorum value", w=2):
+                print("❌ put_quorum failed")
+                return False
+            print("✅ put_quorum reached quorum")
+            
+            # Let the remaining write finish, then check every node has the value
+            await asyncio.gather(*client._background)
+            nodes_info = await client._get_nodes_for_key("quorum:key")
+            for node in [nodes_info["primary"]] + nodes_info["replicas"]:
+                host, port = node.split(':')
+                response = await client._send(host, port, "GET quorum:key")
+                if response != "VALUE quorum value":
+                    print(f"❌ {node} returned {response}")
+                    return False
+            print("✅ All replicas have the value")
+            return True
+        finally:
+            await client.close()
+    
+    return asyncio.run(run())
+
+
+def test_invalid_items():
+    """Test that keys and values the wire framing can't carry are rejected."""
+    print("\n" + "="*50)
+    print("TEST 7: Invalid Keys and Values")
+    print("="*50)
+    
+    client = _client()
+    async_client = AsyncClient(coordinator_host='127.0.0.1', coordinator_port=5000)
+    
+    cases = [
+        ("put with newline in value", lambda: client.put("invalid:key", "line1\nline2")),
+        ("put with empty value", lambda: client.put("invalid:key", "")),
+        ("put with space in key", lambda: client.put("invalid key", "value")),
+        ("multi_put with empty value", lambda: client.multi_put({"invalid:key": ""})),
+        ("get with space in key", lambda: client.get("invalid key")),
+        ("delete with space in key", lambda: client.delete("invalid key")),
+        ("multi_get with empty key", lambda: client.multi_get(["invalid:key", ""])),
+        ("async put with newline in value",
+         lambda: asyncio.run(async_client.put("invalid:key", "line1\nline2"))),
+        ("async delete with space in key", lambda: asyncio.run(async_client.delete("invalid key"))),
+    ]
+    
+    for description, call in cases:
+        try:
+            call()
+        except ValueError:
+            print(f"✅ {description} raised ValueError")
+            continue
+        print(f"❌ {description} was accepted")
+        return False
+    
     return True
 
 
@@ -209,21 +383,24 @@ def main():
         ("Multiple Keys", test_multiple_keys),
         ("Consistent Hashing", test_consistent_hashing),
         ("Replication", test_replication),
+        ("Batch Operations", test_batch_operations),
+        ("Quorum Write", test_quorum_write),
+        ("Invalid Items", test_invalid_items),
     ]
     
-    results = []
+    # Tests use disjoint keys, so they can run against the cluster concurrently
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(len(tests)) as executor:
+            outcomes = list(executor.map(lambda test: _safe_call(output, *test), tests))
+    finally:
+        sys.stdout = output.stream
     
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"\n❌ Test '{test_name}' crashed with error: {e}")
-            import traceback
-            traceback.print_exc()
-            results.append((test_name, False))
-        
-        time.sleep(1)  # Brief delay between tests
+    results = []
+    for (test_name, _), (result, text) in zip(tests, outcomes):
+        sys.stdout.write(text)
+        results.append((test_name, result))
     
     # Print summary
     print("\n" + "="*60)
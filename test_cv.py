@@ -9,6 +9,25 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from client.client import Client
 
+def wait_until(pred, timeout=2.0, interval=0.01):
+    """
+    Poll a condition instead of sleeping a fixed time.
+    
+    Args:
+        pred (callable): Returns True once the condition holds
+        timeout (float): Seconds to keep polling
+        interval (float): Seconds between polls
+    
+    Returns:
+        bool: True if the condition held before the timeout
+    """
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(interval)
+    return False
+
 def main():
     print("=" * 60)
     print("DISTRIBUTED KV STORE - LIVE DEMONSTRATION")
@@ -27,14 +46,15 @@ def main():
     # Test 2: PUT operation
     print("[TEST 2] Storing a key-value pair...")
     print("Command: PUT resume-project 'Distributed-Key-Value-Store-System'")
-    client.put("resume-project", "Distributed-Key-Value-Store-System")
+    print(f"Result: {'OK' if client.put('resume-project', 'Distributed-Key-Value-Store-System') else 'FAILED'}")
     print()
-    time.sleep(1)
+    wait_until(lambda: client.get('resume-project') == 'Distributed-Key-Value-Store-System')
     
     # Test 3: GET operation
     print("[TEST 3] Retrieving the value...")
     print("Command: GET resume-project")
     result = client.get("resume-project")
+    print(f"Result: {result}")
     print()
     
     # Test 4: Additional operations
@@ -47,14 +67,14 @@ def main():
     
     for key, value in entries:
         print(f"PUT {key} = {value}")
-        client.put(key, value)
-        time.sleep(0.5)
+        print(f"  -> {'OK' if client.put(key, value) else 'FAILED'}")
+        wait_until(lambda: client.get(key) == value)
     
     print()
     print("[TEST 5] Retrieving all entries...")
     for key, _ in entries:
         print(f"GET {key}:")
-        client.get(key)
+        print(f"  -> {client.get(key)}")
         print()
     
     print("=" * 60)
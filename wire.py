@@ -0,0 +1,204 @@
+"""
+Wire framing for the Distributed Key-Value Store.
+
+Every message is a 4-byte big-endian length followed by the payload, so a
+single TCP connection can carry any number of request/response pairs.
+"""
+
+import struct
+
+HEADER_SIZE = 4
+MAX_MSG = 16 * 1024 * 1024  # Reject frames larger than 16 MiB
+RECV_BUF_SIZE = 64 * 1024  # Suggested size for per-connection receive buffers
+NOT_FOUND_LEN = 0xFFFFFFFF  # Length placeholder for a missing value in pack_values
+
+_U32 = struct.Struct('!I')
+
+
+def pack_msg(payload):
+    """
+    Prefix a payload with its length header.
+    
+    Args:
+        payload (bytes): Message body
+    
+    Returns:
+        bytes: Framed message
+    
+    Raises:
+        ValueError: If the payload exceeds MAX_MSG (the peer would reject it)
+    """
+    length = len(payload)
+    if length > MAX_MSG:
+        raise ValueError(f"Payload of {length} bytes exceeds limit of {MAX_MSG}")
+    return length.to_bytes(HEADER_SIZE, 'big') + payload
+
+
+def send_msg(sock, payload):
+    """
+    Send one framed message.
+    
+    Args:
+        sock: Connected socket
+        payload (bytes): Message body
+    
+    Raises:
+        ValueError: If the payload exceeds MAX_MSG
+    """
+    sock.sendall(pack_msg(payload))
+
+
+def _recv_into(sock, view):
+    """
+    Fill a memoryview completely from a socket.
+    
+    Args:
+        sock: Connected socket
+        view (memoryview): Writable view to fill
+    
+    Raises:
+        ConnectionError: If the peer closes the connection first
+    """
+    n = len(view)
+    offset = 0
+    while offset < n:
+        received = sock.recv_into(view[offset:])
+        if not received:
+            raise ConnectionError("Connection closed by peer")
+        offset += received
+
+
+def _recv_exact(sock, n):
+    """
+    Read exactly n bytes from a socket.
+    
+    Args:
+        sock: Connected socket
+        n (int): Number of bytes to read
+    
+    Returns:
+        bytearray: The bytes read
+    
+    Raises:
+        ConnectionError: If the peer closes the connection first
+    """
+    buf = bytearray(n)
+    _recv_into(sock, memoryview(buf))
+    return buf
+
+
+def recv_msg(sock, buf=None):
+    """
+    Receive one framed message.
+    
+    With a reusable buf (e.g. bytearray(RECV_BUF_SIZE) kept per connection)
+    the message is read in place and returned as a memoryview, so the receive
+    path allocates nothing. The view is only valid until the next call with
+    the same buf. Frames larger than buf get a one-off buffer; buf is never
+    resized, since that would fail while a caller still holds a view.
+    
+    Args:
+        sock: Connected socket
+        buf (bytearray): Optional reusable receive buffer
+    
+    Returns:
+        bytes: Message body (memoryview into buf if buf is given)
+    
+    Raises:
+        ConnectionError: If the peer closes the connection mid-frame
+        ValueError: If the announced length exceeds MAX_MSG
+    """
+    if buf is None:
+        length = int.from_bytes(_recv_exact(sock, HEADER_SIZE), 'big')
+    else:
+        view = memoryview(buf)
+        _recv_into(sock, view[:HEADER_SIZE])
+        length = int.from_bytes(view[:HEADER_SIZE], 'big')
+    if length > MAX_MSG:
+        raise ValueError(f"Frame of {length} bytes exceeds limit of {MAX_MSG}")
+    if buf is None:
+        return bytes(_recv_exact(sock, length))
+    if length > len(buf):
+        view = memoryview(bytearray(length))
+    view = view[:length]
+    _recv_into(sock, view)
+    return view
+
+
+async def read_msg(reader):
+    """
+    Receive one framed message from an asyncio stream.
+    
+    Args:
+        reader (asyncio.StreamReader): Stream to read from
+    
+    Returns:
+        bytes: Message body
+    
+    Raises:
+        asyncio.IncompleteReadError: If the peer closes the connection mid-frame
+        ValueError: If the announced length exceeds MAX_MSG
+    """
+    length = int.from_bytes(await reader.readexactly(HEADER_SIZE), 'big')
+    if length > MAX_MSG:
+        raise ValueError(f"Frame of {length} bytes exceeds limit of {MAX_MSG}")
+    return await reader.readexactly(length)
+
+
+def pack_values(values):
+    """
+    Serialize many values as one stream: [n][len1][val1][len2][val2]...
+    Every integer is a 4-byte big-endian length; a missing value is sent as
+    NOT_FOUND_LEN with no body, so positions are preserved.
+    
+    Args:
+        values (list): bytes values, or None where not found
+    
+    Returns:
+        bytes: Packed values
+    """
+    out = bytearray(_U32.pack(len(values)))
+    for value in values:
+        if value is None:
+            out += _U32.pack(NOT_FOUND_LEN)
+        else:
+            out += _U32.pack(len(value))
+            out += value
+    return bytes(out)
+
+
+def unpack_values(payload):
+    """
+    Parse a stream built by pack_values.
+    
+    Args:
+        payload (bytes): Packed values
+    
+    Returns:
+        list: bytes values, or None where not found
+    
+    Raises:
+        ValueError: If the payload is truncated or has trailing bytes
+    """
+    view = memoryview(payload)
+    end = len(view)
+    if end < HEADER_SIZE:
+        raise ValueError("Truncated value stream")
+    count = _U32.unpack_from(view, 0)[0]
+    offset = HEADER_SIZE
+    values = []
+    for _ in range(count):
+        if offset + HEADER_SIZE > end:
+            raise ValueError("Truncated value stream")
+        length = _U32.unpack_from(view, offset)[0]
+        offset += HEADER_SIZE
+        if length == NOT_FOUND_LEN:
+            values.append(None)
+            continue
+        if offset + length > end:
+            raise ValueError("Truncated value stream")
+        values.append(bytes(view[offset:offset + length]))
+        offset += length
+    if offset != end:
+        raise ValueError("Trailing bytes after value stream")
+    return values
@@ -0,0 +1,109 @@
+"""
+Pre-forked worker processes for the Distributed Key-Value Store.
+
+The coordinator and nodes can fork several workers that share one listening
+port (SO_REUSEPORT). WorkerGroup forks them and ties their lifetimes
+together, so the parent never keeps running with part of its workers gone
+and the workers can notice the parent itself dying.
+"""
+
+import logging
+import os
+import signal
+import sys
+
+from kvlog import stop_logging
+
+log = logging.getLogger("kv.workers")
+
+
+def exit_on_sigterm():
+    """Take the workers down with us on SIGTERM as well as Ctrl+C."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+class WorkerGroup:
+    """
+    Worker processes forked from one parent.
+    
+    Workers are not interchangeable (one scans for dead nodes or sends the
+    heartbeats, each owns its share of the state), so a group with a worker
+    missing is not worth keeping alive: when any worker exits, the parent
+    stops the rest and exits too.
+    """
+    
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Process name for log messages, e.g. "Coordinator"
+        """
+        self.name = name
+        self.pids = {}  # pid -> worker index, for workers not yet reaped
+        # Only the parent keeps the write end open, so in a worker the read
+        # end becomes readable (EOF) once the parent is gone, even if it was
+        # SIGKILLed
+        self.lifeline, self._lifeline_w = os.pipe()
+    
+    def spawn(self, index, target, *args):
+        """
+        Fork a worker that runs target(*args), then exits.
+        
+        Args:
+            index (int): Worker index, for log messages
+            target (callable): Worker body; only ever called in the child
+            *args: Arguments for target
+        
+        Returns:
+            int: Child pid (the child itself never returns)
+        """
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = index
+            return pid
+        
+        os.close(self._lifeline_w)
+        self.pids = {}  # Siblings are not ours to stop
+        exit_code = 0
+        try:
+            target(*args)
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            log.exception("%s worker %d failed", self.name, index)
+            exit_code = 1
+        finally:
+            stop_logging()
+            sys.stdout.flush()
+            os._exit(exit_code)
+    
+    def wait(self):
+        """
+        Block until any worker exits.
+        
+        Returns:
+            int: Index of the worker that exited
+        """
+        while True:
+            pid, status = os.wait()
+            index = self.pids.pop(pid, None)
+            if index is not None:
+                log.error("%s worker %d exited with code %d, shutting down",
+                          self.name, index, os.waitstatus_to_exitcode(status))
+                return index
+    
+    def stop(self):
+        """Ask every remaining worker to exit."""
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    def reap(self):
+        """Wait for every remaining worker to exit."""
+        for pid in self.pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.pids = {}